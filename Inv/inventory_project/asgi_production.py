@@ -0,0 +1,30 @@
+"""
+ASGI config for inventory_project production deployments.
+
+Same project and settings as ``wsgi_production.py``, served by an ASGI
+server so a slow database round-trip (e.g. over the ngrok tunnel in
+``settings_production``) suspends a coroutine instead of blocking a worker.
+The product/customer/sale lists and dashboard stats use async views here
+(``ASYNC_READ_VIEWS``), and ``/api/notifications/stream/`` needs ASGI.
+
+Run it with, for example:
+
+    uvicorn asgi_production:application --workers 4
+    gunicorn asgi_production:application -k uvicorn.workers.UvicornWorker -w 4
+"""
+
+import os
+import sys
+
+# Add your project directory to sys.path
+project_home = '/home/yourusername/inventory_project'  # Replace 'yourusername' with your actual username
+if project_home not in sys.path:
+    sys.path.insert(0, project_home)
+
+# Set the Django settings module
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_project.settings_production')
+os.environ.setdefault('ASYNC_READ_VIEWS', 'True')
+
+# Import Django's ASGI handler
+from django.core.asgi import get_asgi_application
+application = get_asgi_application()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Benchmark the ABC report (inventory/abc_analysis.py).
+
+Seeds the configured database with a daily sales rollup equivalent to
+``--sales`` sales over ``--products`` products (Pareto-distributed, spread
+over ``--days`` days), then times a cold report, a cached report with no new
+sales and a cached report that folds in ``--new-sales`` fresh Sale rows. Run
+against a scratch database:
+
+    DB_NAME=inventory_bench python benchmarks/bench_abc.py --sales 10000000
+    DB_NAME=inventory_bench python benchmarks/bench_abc.py --cleanup
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_project.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from inventory.abc_analysis import abc_report  # noqa: E402
+from inventory.models import Product, Sale, SalesDailyRollup, User  # noqa: E402
+from inventory.signals import sales_created  # noqa: E402
+
+BENCH_TAG = 'BENCH-ABC'
+BATCH_SIZE = 10000
+
+
+def seed(sales, products, days):
+    print(f"Seeding a rollup for {sales:,} sales over {products:,} products and {days} days...")
+    user = User.objects.create_user(email='abc@bench.local', is_salesperson=True)
+    catalog = Product.objects.bulk_create([
+        Product(name=f'{BENCH_TAG} Product {i}', sku=f'{BENCH_TAG}-{i:06d}', price=Decimal('9.99'),
+                quantity=1000, category='Bench', best_before=date.today() + timedelta(days=365))
+        for i in range(products)
+    ])
+    # Product i sells in proportion to 1 / (i + 1): a long-tailed catalog
+    weights = [1 / (i + 1) for i in range(products)]
+    scale = sales / sum(weights) / days
+    today = date.today()
+    batch = []
+    written = 0
+    for day in range(days):
+        for product, weight in zip(catalog, weights):
+            count = int(weight * scale + random.random())
+            if not count:
+                continue
+            batch.append(SalesDailyRollup(
+                date=today - timedelta(days=day), product=product, user=user,
+                sale_count=count, units=count, amount_total=Decimal('9.99') * count,
+            ))
+            written += count
+        if len(batch) >= BATCH_SIZE:
+            SalesDailyRollup.objects.bulk_create(batch)
+            batch = []
+            print(f"  day {day + 1}/{days}", end='\r')
+    SalesDailyRollup.objects.bulk_create(batch)
+    print(f"\n  {SalesDailyRollup.objects.count():,} rollup rows for {written:,} sales")
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+
+def cleanup():
+    Product.objects.filter(sku__startswith=BENCH_TAG).delete()
+    User.objects.filter(email='abc@bench.local').delete()
+
+
+def timed(fn, repeats=5):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def add_sales(count):
+    user = User.objects.get(email='abc@bench.local')
+    products = list(Product.objects.filter(sku__startswith=BENCH_TAG).values_list('pk', flat=True)[:1000])
+    sales_created(Sale.objects.bulk_create([
+        Sale(user=user, product_id=random.choice(products), amount=Decimal('9.99'), status='completed')
+        for _ in range(count)
+    ]))
+
+
+def cold():
+    cache.clear()
+    abc_report()
+
+
+def with_new_sales(count):
+    add_sales(count)
+    started = time.perf_counter()
+    abc_report()
+    return (time.perf_counter() - started) * 1000
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sales', type=int, default=1000000)
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--new-sales', type=int, default=100)
+    parser.add_argument('--no-seed', action='store_true', help="Reuse previously seeded rows")
+    parser.add_argument('--cleanup', action='store_true', help="Delete seeded rows and exit")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        sys.exit(0)
+    if not args.no_seed:
+        seed(args.sales, args.products, args.days)
+
+    print(f"  cold report (SQL window ranking):  {timed(cold, 3):8.1f} ms")
+    abc_report()
+    print(f"  cached, no new sales:              {timed(abc_report):8.1f} ms")
+    samples = [with_new_sales(args.new_sales) for _ in range(5)]
+    print(f"  cached + {args.new_sales} new sales:            {statistics.median(samples):8.1f} ms")
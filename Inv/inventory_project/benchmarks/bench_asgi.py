@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Compare read throughput of the WSGI and ASGI deployments.
+
+Starts the project under gunicorn (wsgi_production.py, sync views) and then
+under uvicorn (asgi_production.py, async read views) with the same number of
+worker processes, drives each with the same concurrent load against the
+read-heavy endpoints and prints requests/second and latency percentiles.
+Point DJANGO_SETTINGS_MODULE / DB_* at the database you want to measure; the
+difference is largest when database round-trips are slow (e.g. a remote or
+tunnelled database):
+
+    pip install gunicorn uvicorn
+    DJANGO_SETTINGS_MODULE=inventory_project.settings python benchmarks/bench_asgi.py --workers 2 --concurrency 64
+"""
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PATHS = ['/api/products/?limit=50', '/api/customers/', '/api/dashboard-stats/', '/api/sales/']
+
+SERVERS = {
+    'wsgi': lambda port, workers: [
+        'gunicorn', 'wsgi_production:application', '--workers', str(workers), '--bind', f'127.0.0.1:{port}',
+    ],
+    'asgi': lambda port, workers: [
+        'uvicorn', 'asgi_production:application', '--workers', str(workers), '--port', str(port), '--no-access-log',
+    ],
+}
+
+
+def wait_until_up(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/api/dashboard-stats/')
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.3)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def client(port, deadline, latencies, errors):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    i = 0
+    while time.monotonic() < deadline:
+        path = PATHS[i % len(PATHS)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+def drive(port, concurrency, duration):
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=client, args=(port, deadline, latencies, errors), daemon=True)
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def run(mode, args):
+    env = dict(os.environ, ASYNC_READ_VIEWS=str(mode == 'asgi'))
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_project.settings')
+    server = subprocess.Popen(SERVERS[mode](args.port, args.workers), cwd=PROJECT_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up(args.port)
+        drive(args.port, args.concurrency, min(3, args.duration))  # warm up connections and caches
+        latencies, errors = drive(args.port, args.concurrency, args.duration)
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else 0
+    return {
+        'rps': len(latencies) / args.duration,
+        'p50': statistics.median(latencies) if latencies else 0,
+        'p95': percentile(0.95),
+        'p99': percentile(0.99),
+        'errors': len(errors),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=2, help="Server worker processes for both modes")
+    parser.add_argument('--concurrency', type=int, default=64, help="Concurrent client connections")
+    parser.add_argument('--duration', type=int, default=20, help="Seconds of load per mode")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--mode', choices=['wsgi', 'asgi', 'both'], default='both')
+    args = parser.parse_args()
+
+    modes = ['wsgi', 'asgi'] if args.mode == 'both' else [args.mode]
+    results = {}
+    for mode in modes:
+        print(f"Running {mode} with {args.workers} workers, {args.concurrency} clients, {args.duration}s...")
+        results[mode] = run(mode, args)
+
+    print("\n%-6s %10s %10s %10s %10s %8s" % ('mode', 'req/s', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'errors'))
+    for mode, r in results.items():
+        print("%-6s %10.1f %10.1f %10.1f %10.1f %8d" % (mode, r['rps'], r['p50'], r['p95'], r['p99'], r['errors']))
+    if len(results) == 2 and results['wsgi']['rps']:
+        print(f"\nASGI/WSGI throughput: {results['asgi']['rps'] / results['wsgi']['rps']:.2f}x")
+    sys.exit(1 if any(r['errors'] for r in results.values()) else 0)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+Benchmark the reorder-point forecast in inventory/forecasting.py.
+
+Generates synthetic sparse daily sales for ``--products`` products over
+``--days`` days (each product sells on roughly ``--density`` of the days)
+and times the vectorized pass over them. With ``--db`` it instead times the
+database path: load_daily_units() reading the grouped rollup (with its peak
+Python memory), then the full update_reorder_points() run including the
+bulk_update. ``--seed`` first writes the same synthetic history to the
+configured database as rollup rows. Run against a scratch database:
+
+    python benchmarks/bench_forecast.py --products 50000 --days 730
+    DB_NAME=inventory_bench python benchmarks/bench_forecast.py --db --seed --products 20000 --days 365
+    DB_NAME=inventory_bench python benchmarks/bench_forecast.py --cleanup
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_project.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.utils import timezone  # noqa: E402
+
+from inventory.forecasting import forecast, load_daily_units, update_reorder_points  # noqa: E402
+from inventory.models import Product, SalesDailyRollup, User  # noqa: E402
+
+BENCH_TAG = 'BENCH-FC'
+BATCH_SIZE = 10000
+
+
+def synthetic_history(products, days, density, rng):
+    pairs = int(products * days * density)
+    product_index = rng.integers(0, products, size=pairs)
+    day_index = rng.integers(0, days, size=pairs)
+    # Collapse duplicate (product, day) draws the way the grouped query would
+    keys, inverse = np.unique(product_index * days + day_index, return_inverse=True)
+    units = np.bincount(inverse, weights=rng.poisson(3, size=pairs) + 1.0)
+    return keys // days, keys % days, units
+
+
+def seed(products, days, density, rng):
+    product_index, day_index, units = synthetic_history(products, days, density, rng)
+    print(f"Seeding {len(units):,} rollup rows for {products:,} products over {days} days...")
+    user = User.objects.create_user(email='forecast@bench.local', is_salesperson=True)
+    today = timezone.localdate()
+    catalog = Product.objects.bulk_create([
+        Product(name=f'{BENCH_TAG} Product {i}', sku=f'{BENCH_TAG}-{i:06d}', price=Decimal('1.00'),
+                quantity=1000, category='Bench', best_before=today + timedelta(days=365))
+        for i in range(products)
+    ], batch_size=BATCH_SIZE)
+    pks = [product.pk for product in catalog]
+    for offset in range(0, len(units), BATCH_SIZE):
+        SalesDailyRollup.objects.bulk_create([
+            SalesDailyRollup(date=today - timedelta(days=days - 1 - day), product_id=pks[product], user=user,
+                             sale_count=1, units=int(count), amount_total=Decimal(int(count)))
+            for product, day, count in zip(
+                product_index[offset:offset + BATCH_SIZE].tolist(),
+                day_index[offset:offset + BATCH_SIZE].tolist(),
+                units[offset:offset + BATCH_SIZE].tolist(),
+            )
+        ])
+        print(f"  {min(offset + BATCH_SIZE, len(units)):,}/{len(units):,}", end='\r')
+    print()
+
+
+def cleanup():
+    Product.objects.filter(sku__startswith=BENCH_TAG).delete()
+    User.objects.filter(email='forecast@bench.local').delete()
+
+
+def bench_db(days, repeats):
+    end = timezone.localdate()
+    start = end - timedelta(days=days - 1)
+    product_ids = np.fromiter(Product.objects.order_by('pk').values_list('pk', flat=True), dtype=np.int64)
+
+    seconds, (_, _, units) = timed(lambda: load_daily_units(product_ids, start, end), repeats)
+    tracemalloc.start()
+    load_daily_units(product_ids, start, end)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{len(product_ids):,} products x {days} days: {len(units):,} (product, day) rows")
+    print(f"  load_daily_units:      {seconds:.2f}s (median of {repeats}), peak {peak / 2 ** 20:.1f} MiB")
+
+    seconds, updated = timed(lambda: update_reorder_points(history_days=days), 1)
+    print(f"  update_reorder_points: {seconds:.2f}s, {updated:,} products updated")
+
+
+def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=50000)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--density', type=float, default=0.3, help="Share of days on which a product sells")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--db', action='store_true', help="Time the rollup load and update_reorder_points()")
+    parser.add_argument('--seed', action='store_true', help="Write synthetic history to the database first")
+    parser.add_argument('--cleanup', action='store_true', help="Delete seeded rows and exit")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        sys.exit(0)
+
+    rng = np.random.default_rng(1)
+    if args.seed:
+        seed(args.products, args.days, args.density, rng)
+    if args.db:
+        bench_db(args.days, args.repeats)
+        sys.exit(0)
+
+    started = time.perf_counter()
+    product_index, day_index, units = synthetic_history(args.products, args.days, args.density, rng)
+    print(f"{args.products:,} products x {args.days} days: {len(units):,} (product, day) rows "
+          f"generated in {time.perf_counter() - started:.2f}s")
+
+    seconds, (velocity, reorder_points) = timed(lambda: forecast(
+        product_index, day_index, units, n_products=args.products, n_days=args.days,
+        half_life_days=14, lead_time_days=7, service_z=1.65,
+    ), args.repeats)
+    print(f"  vectorized forecast: {seconds:.3f}s (median of {args.repeats})")
+    print(f"  mean velocity {velocity.mean():.2f}/day, mean reorder point {reorder_points.mean():.1f}")
@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+"""
+Benchmark the hot-path indexes added in inventory/migrations/0003.
+
+Seeds the configured database with synthetic sales and audit rows, then for
+every index runs its query with the index in place and again after dropping
+it, printing the query plan and median latency for both. Run against a
+scratch database:
+
+    DB_NAME=inventory_bench python benchmarks/bench_indexes.py --rows 1000000
+    DB_NAME=inventory_bench python benchmarks/bench_indexes.py --cleanup
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_project.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from inventory.models import AuditLog, Customer, Notification, Product, Sale, User  # noqa: E402
+
+BENCH_TAG = 'BENCH'
+BATCH_SIZE = 10000
+HISTORY_DAYS = 730
+
+
+def seed(rows):
+    print(f"Seeding {rows:,} sales and {rows:,} audit rows...")
+    users = User.objects.bulk_create([
+        User(email=f'bench{i}@bench.local', is_salesperson=True, is_active=i % 5 != 0)
+        for i in range(200)
+    ])
+    products = Product.objects.bulk_create([
+        Product(
+            name=f'{BENCH_TAG} Product {i}', sku=f'{BENCH_TAG}-{i:06d}', price=Decimal('9.99'),
+            quantity=random.randint(0, 500), category=f'Category {i % 40}',
+            best_before=date.today() + timedelta(days=random.randint(-30, 365)),
+            discontinued=i % 10 == 0, low_stock_threshold=10,
+        )
+        for i in range(20000)
+    ])
+    customers = Customer.objects.bulk_create([
+        Customer(name=f'{BENCH_TAG} Customer {i}', email=f'c{i}@bench.local', phone='0', address='-')
+        for i in range(20000)
+    ])
+
+    # Spread rows across history instead of letting auto_now_add stamp them all "now"
+    date_field = Sale._meta.get_field('date')
+    timestamp_field = AuditLog._meta.get_field('timestamp')
+    date_field.auto_now_add = timestamp_field.auto_now_add = False
+    try:
+        today = date.today()
+        now = timezone.now()
+        for start in range(0, rows, BATCH_SIZE):
+            count = min(BATCH_SIZE, rows - start)
+            Sale.objects.bulk_create([
+                Sale(
+                    user=random.choice(users), product=random.choice(products),
+                    customer=random.choice(customers), amount=Decimal('19.98'), status='completed',
+                    date=today - timedelta(days=random.randrange(HISTORY_DAYS)),
+                )
+                for _ in range(count)
+            ])
+            AuditLog.objects.bulk_create([
+                AuditLog(
+                    type=BENCH_TAG, user='bench', action='Viewed product list', ip_address='127.0.0.1',
+                    timestamp=now - timedelta(seconds=random.randrange(HISTORY_DAYS * 86400)),
+                )
+                for _ in range(count)
+            ])
+            print(f"  {start + count:,}/{rows:,}", end='\r')
+    finally:
+        date_field.auto_now_add = timestamp_field.auto_now_add = True
+    Notification.objects.bulk_create([
+        Notification(message=f'{BENCH_TAG} notification {i}', type='info') for i in range(50000)
+    ])
+    print()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+
+def cleanup():
+    Sale.objects.filter(product__sku__startswith=BENCH_TAG).delete()
+    AuditLog.objects.filter(type=BENCH_TAG).delete()
+    Notification.objects.filter(message__startswith=BENCH_TAG).delete()
+    Product.objects.filter(sku__startswith=BENCH_TAG).delete()
+    Customer.objects.filter(name__startswith=BENCH_TAG).delete()
+    User.objects.filter(email__endswith='@bench.local').delete()
+
+
+def cases():
+    since = date.today() - timedelta(days=7)
+    return [
+        (Sale, 'sale_date_id_idx', lambda: list(Sale.objects.order_by('-date', '-id')[:50])),
+        (Sale, 'sale_date_id_idx', lambda: Sale.objects.filter(date__gte=since).count()),
+        (AuditLog, 'auditlog_timestamp_idx', lambda: list(AuditLog.objects.order_by('-timestamp')[:100])),
+        (Notification, 'notification_created_idx', lambda: list(Notification.objects.order_by('-created_at')[:20])),
+        (Customer, 'customer_join_date_idx', lambda: list(Customer.objects.order_by('-join_date')[:50])),
+        (Product, 'product_low_stock_idx', lambda: list(Product.objects.low_stock().values('id')[:50])),
+        (User, 'user_active_sales_idx', lambda: User.objects.filter(is_salesperson=True, is_active=True).count()),
+    ]
+
+
+def explain(query):
+    """Capture the SQL of ``query`` and return its plan"""
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as captured:
+        query()
+    sql = captured.captured_queries[-1]['sql']
+    prefix = 'EXPLAIN ANALYZE ' if connection.vendor == 'postgresql' else 'EXPLAIN QUERY PLAN '
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql)
+        return sql, '\n'.join('    ' + ' | '.join(str(col) for col in row) for row in cursor.fetchall())
+
+
+def timed(query, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        query()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run(repeats):
+    results = []
+    for model, index_name, query in cases():
+        index = next(i for i in model._meta.indexes if i.name == index_name)
+        with_index = timed(query, repeats)
+        sql, plan_with = explain(query)
+        with connection.schema_editor() as editor:
+            editor.remove_index(model, index)
+        try:
+            without_index = timed(query, repeats)
+            _, plan_without = explain(query)
+        finally:
+            with connection.schema_editor() as editor:
+                editor.add_index(model, index)
+
+        print(f"\n=== {index_name}\n{sql}")
+        print(f"  without index: {without_index:9.2f} ms\n{plan_without}")
+        print(f"  with index:    {with_index:9.2f} ms\n{plan_with}")
+        results.append((index_name, without_index, with_index))
+
+    print("\n%-28s %14s %14s %9s" % ('index', 'without (ms)', 'with (ms)', 'speedup'))
+    for name, without_index, with_index in results:
+        print("%-28s %14.2f %14.2f %8.1fx" % (name, without_index, with_index, without_index / max(with_index, 1e-6)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Sale and AuditLog rows to seed")
+    parser.add_argument('--repeats', type=int, default=20, help="Timed runs per query")
+    parser.add_argument('--skip-seed', action='store_true', help="Reuse rows from a previous run")
+    parser.add_argument('--cleanup', action='store_true', help="Delete seeded rows and exit")
+    args = parser.parse_args()
+
+    print(f"Database: {connection.vendor} / {connection.settings_dict['NAME']}")
+    if args.cleanup:
+        cleanup()
+    else:
+        if not args.skip_seed:
+            seed(args.rows)
+        run(args.repeats)
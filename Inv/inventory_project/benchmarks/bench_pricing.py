@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Benchmark inventory/pricing.py on large quotes.
+
+Compiles a synthetic rule set (per-SKU quantity tiers, per-category rules and
+order thresholds) and prices a quote of ``--lines`` lines, comparing the
+compiled engine against re-scanning every rule for every line:
+
+    python benchmarks/bench_pricing.py --lines 10000 --rules 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory.pricing import HUNDRED, ZERO, PricingEngine, _decimal, _money  # noqa: E402
+
+
+def make_rules(count, skus, categories):
+    rules = []
+    for i in range(count):
+        rule = {'id': str(i), 'name': f'Rule {i}', 'isActive': i % 7 != 0}
+        if i % 3 == 0:
+            rule.update(type='percentage', value=random.randint(1, 30), sku=random.choice(skus),
+                        minQuantity=random.choice([1, 5, 10, 50]))
+        elif i % 3 == 1:
+            rule.update(type='fixed', value=random.randint(1, 5), category=random.choice(categories))
+        else:
+            rule.update(type='percentage', value=random.randint(1, 15), minAmount=random.randint(0, 100000))
+        rules.append(rule)
+    return rules
+
+
+def naive_quote(rules, lines):
+    """Price every line by scanning the raw rule list, as a per-request implementation would"""
+    subtotal = ZERO
+    for product, quantity in lines:
+        line_subtotal = product.price * quantity
+        discount = ZERO
+        for rule in rules:
+            if not rule['isActive'] or not (rule.get('sku') == product.sku or rule.get('category') == product.category):
+                continue
+            if quantity < _decimal(rule.get('minQuantity'), ZERO):
+                continue
+            value = _decimal(rule['value'])
+            discount = max(discount, line_subtotal * value / HUNDRED if rule['type'] == 'percentage' else value)
+        subtotal += line_subtotal - _money(min(discount, line_subtotal))
+    order_discount = ZERO
+    for rule in rules:
+        if rule['isActive'] and 'minAmount' in rule and subtotal >= rule['minAmount']:
+            order_discount = max(order_discount, subtotal * _decimal(rule['value']) / HUNDRED)
+    return _money(subtotal - order_discount)
+
+
+def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=10000, help="Lines per quote")
+    parser.add_argument('--rules', type=int, default=2000, help="Discount rules in the settings")
+    parser.add_argument('--products', type=int, default=5000, help="Distinct products in the catalog")
+    parser.add_argument('--repeats', type=int, default=5, help="Timed runs per implementation")
+    args = parser.parse_args()
+
+    random.seed(1)
+    categories = [f'Category {i}' for i in range(40)]
+    catalog = [
+        SimpleNamespace(pk=i, sku=f'SKU-{i:06d}', category=random.choice(categories),
+                        price=Decimal(random.randint(100, 10000)) / 100)
+        for i in range(args.products)
+    ]
+    rules = make_rules(args.rules, [p.sku for p in catalog], categories)
+    lines = [(random.choice(catalog), random.randint(1, 60)) for _ in range(args.lines)]
+
+    compile_ms, engine = timed(lambda: PricingEngine(rules, '12.5'), args.repeats)
+    engine_ms, quote = timed(lambda: engine.quote(lines), args.repeats)
+    naive_ms, _ = timed(lambda: naive_quote(rules, lines), max(1, args.repeats // 2))
+
+    print(f"{args.lines:,} lines, {args.rules:,} rules")
+    print(f"  compile rules:   {compile_ms:9.2f} ms (once per settings version)")
+    print(f"  compiled quote:  {engine_ms:9.2f} ms  total={quote['total']}")
+    print(f"  naive rescan:    {naive_ms:9.2f} ms")
+    print(f"  speedup:         {naive_ms / max(engine_ms, 1e-6):8.1f}x")
@@ -0,0 +1,163 @@
+# inventory/abc_analysis.py
+"""
+ABC (Pareto) classification of products by revenue over a date range.
+
+Products are ranked by revenue; class A holds the top sellers making up
+``ABC_CLASS_A_SHARE`` of revenue, B the next ones up to ``ABC_CLASS_B_SHARE``
+and C the tail. A product is classed by the cumulative share *before* it, so
+the one that crosses a boundary stays in the higher class.
+
+The first report for a range is ranked in SQL (window sums over the daily
+rollup) and cached with a watermark, the highest Sale id it covers. Later
+requests aggregate only the sales above the watermark and re-rank the cached
+rows. Editing or deleting a sale bumps the 'abc-reports' CollectionVersion
+row, which every worker reads into its cache keys, so all cached reports are
+dropped; reports are recomputed from scratch after ``ABC_REPORT_TTL``
+seconds regardless. The watermark is a primary key, so a sale whose id was
+allocated before the watermark but committed after it is only counted by
+that full recompute.
+"""
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Func, Max, RowRange, Sum, Window
+
+from .models import Product, Sale, SalesDailyRollup
+from .versions import ABC_REPORTS, bump_collection_version, collection_version
+
+REPORT_CACHE_PREFIX = 'inventory:abc-report'
+
+
+class _WindowSum(Func):
+    """SUM() over an aggregate, usable as a window function"""
+    function = 'SUM'
+    window_compatible = True
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _in_range(queryset, start, end):
+    if start:
+        queryset = queryset.filter(date__gte=start)
+    if end:
+        queryset = queryset.filter(date__lte=end)
+    return queryset
+
+
+def _classify(revenue_before, a_limit, b_limit):
+    if revenue_before < a_limit:
+        return 'A'
+    if revenue_before < b_limit:
+        return 'B'
+    return 'C'
+
+
+def _rank_from_rollup(start, end):
+    """``[(product_id, sku, name, revenue, cumulative)]`` best first, and the total"""
+    revenue = _in_range(SalesDailyRollup.objects.all(), start, end).values('product_id').annotate(
+        revenue=Sum('amount_total')
+    ).filter(revenue__gt=0)
+    rows = list(revenue.annotate(
+        cumulative=Window(
+            _WindowSum(F('revenue')),
+            order_by=[F('revenue').desc(), F('product_id').asc()],
+            frame=RowRange(start=None, end=0),
+        ),
+        total=Window(_WindowSum(F('revenue'))),
+    ).order_by('-revenue', 'product_id').values_list(
+        'product_id', 'product__sku', 'product__name', 'revenue', 'cumulative', 'total'
+    ))
+    total = rows[0][5] if rows else Decimal('0')
+    return [row[:5] for row in rows], total
+
+
+def _rerank(rows):
+    """Python counterpart of the window sums in _rank_from_rollup()"""
+    rows.sort(key=lambda row: (-row[3], row[0]))
+    ranked = []
+    cumulative = Decimal('0')
+    for product_id, sku, name, revenue, _ in rows:
+        cumulative += revenue
+        ranked.append((product_id, sku, name, revenue, cumulative))
+    return ranked, cumulative
+
+
+def _apply_new_sales(entry, start, end):
+    """Fold sales above the entry's watermark into it; False when there are none"""
+    latest = Sale.objects.filter(pk__gt=entry['watermark']).aggregate(latest=Max('pk'))['latest']
+    if latest is None:
+        return False
+    new_sales = _in_range(Sale.objects.filter(pk__gt=entry['watermark'], pk__lte=latest), start, end)
+    deltas = dict(new_sales.order_by().values('product_id').annotate(
+        revenue=Sum('amount')
+    ).values_list('product_id', 'revenue'))
+    entry['watermark'] = latest
+    if not deltas:
+        return True
+
+    rows = {row[0]: list(row) for row in entry['rows']}
+    unseen = deltas.keys() - rows.keys()
+    for product_id, sku, name in Product.objects.filter(pk__in=unseen).values_list('pk', 'sku', 'name'):
+        rows[product_id] = [product_id, sku, name, Decimal('0'), None]
+    for product_id, revenue in deltas.items():
+        if product_id in rows:
+            rows[product_id][3] += revenue
+    entry['rows'], entry['total'] = _rerank([row for row in rows.values() if row[3] > 0])
+    return True
+
+
+def _cache_key(start, end):
+    generation = collection_version(ABC_REPORTS)
+    return f"{REPORT_CACHE_PREFIX}:{generation}:{start or ''}:{end or ''}"
+
+
+def invalidate_abc_reports():
+    # A new generation orphans every cached report in every worker; they expire on their own
+    bump_collection_version(ABC_REPORTS)
+
+
+def _ranked_entry(start, end):
+    ttl = _setting('ABC_REPORT_TTL', 3600)
+    key = _cache_key(start, end)
+    entry = cache.get(key)
+    if entry is None:
+        rows, total = _rank_from_rollup(start, end)
+        # Read after the ranking: a sale committed in between is left out
+        # until the next full recompute rather than counted twice
+        watermark = Sale.objects.aggregate(latest=Max('pk'))['latest'] or 0
+        entry = {'rows': rows, 'total': total, 'watermark': watermark, 'computed_at': time.time()}
+        cache.set(key, entry, ttl)
+    elif _apply_new_sales(entry, start, end):
+        # Keep the original expiry so incremental updates can't postpone the full recompute forever
+        remaining = ttl - (time.time() - entry['computed_at'])
+        if remaining > 0:
+            cache.set(key, entry, remaining)
+    return entry
+
+
+def abc_report(start=None, end=None):
+    """Revenue, share and A/B/C class of every product that sold in ``start``..``end``"""
+    entry = _ranked_entry(start, end)
+    total = entry['total']
+    a_limit = total * Decimal(str(_setting('ABC_CLASS_A_SHARE', 0.8)))
+    b_limit = total * Decimal(str(_setting('ABC_CLASS_B_SHARE', 0.95)))
+
+    classes = {'A': 0, 'B': 0, 'C': 0}
+    results = []
+    for product_id, sku, name, revenue, cumulative in entry['rows']:
+        band = _classify(cumulative - revenue, a_limit, b_limit)
+        classes[band] += 1
+        results.append({
+            'product': product_id,
+            'sku': sku,
+            'name': name,
+            'revenue': revenue,
+            'share': round(float(revenue / total), 4),
+            'cumulative_share': round(float(cumulative / total), 4),
+            'class': band,
+        })
+    return {'start': start, 'end': end, 'total_revenue': total, 'classes': classes, 'results': results}
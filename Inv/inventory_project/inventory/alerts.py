@@ -0,0 +1,65 @@
+# inventory/alerts.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Notification, Product, StockAlertState
+
+
+def _save_states(states, field):
+    # Insert new state rows; existing ones only get ``field`` overwritten
+    StockAlertState.objects.bulk_create(
+        states, update_conflicts=True, unique_fields=['product'], update_fields=[field, 'updated_at'],
+    )
+
+
+def check_stock_alerts(expiry_days=None, today=None):
+    """
+    Notify about products that became low on stock or entered the expiry window.
+
+    Candidates come from the partial low-stock and best-before indexes and
+    are compared with ``StockAlertState``, so a run reads only the products
+    currently in an alert condition and writes only for those whose state
+    changed: one Notification per newly low product, one per product whose
+    ``best_before`` entered the window (again if the date changes), and the
+    low-stock flag is cleared for recovered products so a later drop alerts
+    again. Returns counts of what changed.
+    """
+    if expiry_days is None:
+        expiry_days = getattr(settings, 'EXPIRY_ALERT_DAYS', 14)
+    today = today or timezone.localdate()
+    fields = ('id', 'name', 'sku', 'quantity', 'low_stock_threshold', 'best_before')
+
+    with transaction.atomic():
+        newly_low = list(Product.objects.low_stock().exclude(alert_state__low_stock=True).only(*fields))
+        recovered = StockAlertState.objects.filter(low_stock=True).exclude(
+            product__in=Product.objects.low_stock().values('pk')
+        ).update(low_stock=False, updated_at=timezone.now())
+        expiring = list(Product.objects.filter(
+            discontinued=False, best_before__lte=today + timedelta(days=expiry_days)
+        ).exclude(alert_state__expiry_alerted_for=F('best_before')).only(*fields))
+
+        notifications = [
+            Notification(
+                type='warning',
+                message=f"Low stock: {p.name} ({p.sku}) has {p.quantity} left (threshold {p.low_stock_threshold})",
+            )
+            for p in newly_low
+        ] + [
+            Notification(type='error', message=f"Expired: {p.name} ({p.sku}) was best before {p.best_before}")
+            if p.best_before < today else
+            Notification(type='warning', message=f"Expiring soon: {p.name} ({p.sku}) is best before {p.best_before}")
+            for p in expiring
+        ]
+        # Open notification streams pick these up by polling (events.NotificationPoller)
+        Notification.objects.bulk_create(notifications)
+
+        _save_states([StockAlertState(product_id=p.pk, low_stock=True) for p in newly_low], 'low_stock')
+        _save_states(
+            [StockAlertState(product_id=p.pk, expiry_alerted_for=p.best_before) for p in expiring], 'expiry_alerted_for'
+        )
+
+    return {'low_stock': len(newly_low), 'recovered': recovered, 'expiring': len(expiring)}
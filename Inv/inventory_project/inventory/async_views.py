@@ -0,0 +1,95 @@
+# inventory/async_views.py
+"""
+Async implementations of the read-heavy list endpoints.
+
+Enabled with ``ASYNC_READ_VIEWS`` and served by the ASGI application: a GET
+waiting on the database suspends a coroutine instead of holding a worker
+thread. Writes on the same routes are handed to the existing synchronous
+views, so their behaviour (validation, audit, idempotency) is unchanged.
+"""
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+from .dashboard import aget_dashboard_snapshot
+from .filters import InvalidFilter, expand_param, fields_param, filter_products, filter_sale_history
+from .models import Customer, Product, Sale
+from .pagination import DateIdCursorPagination, IdCursorPagination, InvalidCursor, wants_cursor_page
+from .serializers import SALE_EXPANSIONS, CustomerSerializer, ProductSerializer, SaleSerializer, project_sales
+from .versions import CUSTOMERS, PRODUCTS, aversioned
+from .views import log_audit
+
+
+def _json(data, status=200):
+    # DRF's encoder, so decimals and dates come out as they do from the APIViews
+    return JsonResponse(data, status=status, safe=False, encoder=JSONEncoder)
+
+
+@aversioned(PRODUCTS)
+async def product_list(request):
+    try:
+        products = filter_products(Product.objects.all(), request.GET)
+        fields = fields_param(request.GET, ProductSerializer.field_names())
+    except InvalidFilter as e:
+        return _json({'error': str(e)}, status=400)
+    if fields:
+        products = products.only(*ProductSerializer.columns(fields))
+    await sync_to_async(log_audit)("VIEW", "User", "Viewed product list", request)
+    if wants_cursor_page(request):
+        try:
+            page, next_cursor = await IdCursorPagination().apaginate(products, request)
+        except InvalidCursor:
+            return _json({'error': 'Invalid cursor or limit'}, status=400)
+        return _json({'results': ProductSerializer(page, many=True, fields=fields).data, 'next': next_cursor})
+    rows = [product async for product in products.order_by('-id')]
+    return _json(ProductSerializer(rows, many=True, fields=fields).data)
+
+
+@aversioned(CUSTOMERS)
+async def customer_list(request):
+    try:
+        fields = fields_param(request.GET, CustomerSerializer.field_names())
+    except InvalidFilter as e:
+        return _json({'error': str(e)}, status=400)
+    customers = Customer.objects.order_by('-join_date')
+    if fields:
+        customers = customers.only(*CustomerSerializer.columns(fields))
+    rows = [customer async for customer in customers]
+    return _json(CustomerSerializer(rows, many=True, fields=fields).data)
+
+
+async def sale_list(request):
+    try:
+        sales = filter_sale_history(Sale.objects.all(), request.GET)
+        fields = fields_param(request.GET, SaleSerializer.field_names())
+        expand = expand_param(request.GET, SALE_EXPANSIONS)
+    except InvalidFilter as e:
+        return _json({'error': str(e)}, status=400)
+    sales, expand = project_sales(sales, fields, expand)
+    if wants_cursor_page(request):
+        try:
+            page, next_cursor = await DateIdCursorPagination().apaginate(sales, request)
+        except InvalidCursor:
+            return _json({'error': 'Invalid cursor or limit'}, status=400)
+        serializer = SaleSerializer(page, many=True, fields=fields, expand=expand)
+        return _json({'results': serializer.data, 'next': next_cursor})
+    rows = [sale async for sale in sales.order_by('-date', '-id')]
+    return _json(SaleSerializer(rows, many=True, fields=fields, expand=expand).data)
+
+
+async def dashboard_stats(request):
+    stats, age = await aget_dashboard_snapshot()
+    return _json({**stats, "snapshotAge": round(age, 3)})
+
+
+def with_async_get(view_class, get):
+    """Serve GET/HEAD from the coroutine ``get`` and every other method from ``view_class``"""
+    sync_view = sync_to_async(view_class.as_view())
+
+    async def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return await get(request, *args, **kwargs)
+        return await sync_view(request, *args, **kwargs)
+
+    view.csrf_exempt = True  # as APIView.as_view() does
+    return view
@@ -0,0 +1,127 @@
+# inventory/audit.py
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class AuditSink:
+    """
+    In-process buffer for audit events.
+
+    Requests hand their AuditLog rows to a bounded queue and return straight
+    away; a daemon thread drains the queue and writes the rows with
+    ``bulk_create`` whenever ``batch_size`` events are waiting or
+    ``flush_interval`` seconds have passed. When the queue is full the event
+    is dropped and counted rather than blocking the request.
+
+    With ``autostart=False`` no thread is spawned and rows are only written
+    by explicit ``flush()`` calls.
+    """
+
+    def __init__(self, batch_size=100, flush_interval=2.0, max_queue_size=10000, autostart=True):
+        self.batch_size = batch_size
+        self.autostart = autostart
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def submit(self, entry):
+        if self.autostart:
+            self._ensure_worker()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropped = self.dropped
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning("Audit queue full, %s audit events dropped so far", dropped)
+
+    def flush(self):
+        """Write everything currently queued; safe to call from any thread"""
+        while True:
+            batch = self._take(self.batch_size, timeout=0)
+            if not batch:
+                return
+            self._write(batch)
+
+    def close(self):
+        self._closed = True
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+        }
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='audit-sink', daemon=True)
+                self._thread.start()
+
+    def _take(self, limit, timeout):
+        batch = []
+        deadline = time.monotonic() + timeout
+        while len(batch) < limit:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._closed:
+            batch = self._take(self.batch_size, timeout=self.flush_interval)
+            if batch:
+                # This thread has no request cycle to recycle its connection;
+                # flush() callers keep theirs untouched
+                close_old_connections()
+                self._write(batch)
+
+    def _write(self, batch):
+        from .models import AuditLog
+
+        try:
+            AuditLog.objects.bulk_create(batch, batch_size=self.batch_size)
+            with self._lock:
+                self.written += len(batch)
+        except Exception as e:
+            logger.error("Audit flush of %s events failed: %s", len(batch), e)
+
+
+audit_sink = AuditSink(
+    batch_size=getattr(settings, 'AUDIT_LOG_BATCH_SIZE', 100),
+    flush_interval=getattr(settings, 'AUDIT_LOG_FLUSH_INTERVAL', 2.0),
+    max_queue_size=getattr(settings, 'AUDIT_LOG_QUEUE_SIZE', 10000),
+)
+atexit.register(audit_sink.close)
+
+
+def record_audit(entry):
+    """Queue an unsaved AuditLog, or save it inline when the sink is disabled"""
+    if getattr(settings, 'AUDIT_LOG_ASYNC', True):
+        audit_sink.submit(entry)
+    else:
+        entry.save()
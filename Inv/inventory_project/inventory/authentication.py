@@ -0,0 +1,107 @@
+# inventory/authentication.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    """
+    Two-level token -> (user, token) cache.
+
+    A bounded LRU in process memory answers repeat requests without any I/O;
+    its entries expire after ``local_ttl`` seconds so invalidations made by
+    other workers are picked up quickly. Behind it the shared Django cache
+    holds entries for ``shared_ttl`` seconds and is where invalidation lands.
+
+    The shared tier is only used when the configured cache really is shared
+    between workers. A per-process cache (LocMemCache) would let another
+    worker keep accepting a revoked token for ``shared_ttl`` seconds, so with
+    one only the local tier is kept and revocation takes ``local_ttl`` at most.
+    """
+
+    def __init__(self, max_size=1024, local_ttl=10, shared_ttl=300):
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.shared_ttl = shared_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _shared():
+        return not isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache))
+
+    @staticmethod
+    def _cache_key(key):
+        return 'auth:token:' + hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+
+        if not self._shared():
+            return None
+        credentials = cache.get(self._cache_key(key))
+        if credentials is not None:
+            self._remember(key, credentials, now)
+        return credentials
+
+    def set(self, key, credentials):
+        if self._shared():
+            cache.set(self._cache_key(key), credentials, self.shared_ttl)
+        self._remember(key, credentials, time.monotonic())
+
+    def invalidate(self, key):
+        if self._shared():
+            cache.delete(self._cache_key(key))
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear_local(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key, credentials, now):
+        with self._lock:
+            self._entries[key] = (now + self.local_ttl, credentials)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+token_cache = TokenCache(
+    max_size=getattr(settings, 'AUTH_TOKEN_LRU_SIZE', 1024),
+    local_ttl=getattr(settings, 'AUTH_TOKEN_LOCAL_TTL', 10),
+    shared_ttl=getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 300),
+)
+
+
+def invalidate_user_tokens(user):
+    from rest_framework.authtoken.models import Token
+
+    for key in Token.objects.filter(user=user).values_list('key', flat=True):
+        token_cache.invalidate(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that skips the Token/User query for recently seen tokens"""
+
+    def authenticate_credentials(self, key):
+        credentials = token_cache.get(key)
+        if credentials is None:
+            # Raises AuthenticationFailed for unknown tokens and inactive users
+            credentials = super().authenticate_credentials(key)
+            token_cache.set(key, credentials)
+        return credentials
@@ -0,0 +1,137 @@
+# inventory/dashboard.py
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Count, F, Sum
+
+from .models import Product, Sale, SalesTotals, User
+
+SNAPSHOT_CACHE_KEY = 'inventory:dashboard-stats'
+LOW_STOCK_LIMIT = 50
+SALES_TOTALS_PK = 1
+
+
+def get_sales_totals():
+    totals = SalesTotals.objects.filter(pk=SALES_TOTALS_PK).first()
+    if totals is None:
+        totals = rebuild_sales_totals()
+    return totals
+
+
+def apply_sales_to_totals(count, revenue):
+    """Atomically add (or with negative values, remove) sales from the running totals"""
+    updated = SalesTotals.objects.filter(pk=SALES_TOTALS_PK).update(
+        total_sales=F('total_sales') + count,
+        total_revenue=F('total_revenue') + revenue,
+    )
+    if not updated:
+        # First sale on a fresh database: seed from the table, which already
+        # includes the row being saved.
+        rebuild_sales_totals()
+
+
+def aggregate_sales_totals():
+    totals = Sale.objects.aggregate(count=Count('id'), revenue=Sum('amount'))
+    return totals['count'], totals['revenue'] or 0
+
+
+def rebuild_sales_totals():
+    count, revenue = aggregate_sales_totals()
+    try:
+        with transaction.atomic():
+            totals, _ = SalesTotals.objects.update_or_create(
+                pk=SALES_TOTALS_PK, defaults={'total_sales': count, 'total_revenue': revenue}
+            )
+    except IntegrityError:
+        # Another worker seeded the row concurrently
+        totals = SalesTotals.objects.get(pk=SALES_TOTALS_PK)
+    return totals
+
+
+def _count_products():
+    return Product.objects.count()
+
+
+def _count_active_salespeople():
+    return User.objects.filter(is_salesperson=True, is_active=True).count()
+
+
+def _low_stock_items():
+    return list(Product.objects.low_stock().order_by(
+        'quantity', 'id'
+    ).values('id', 'name', 'quantity', 'sku')[:LOW_STOCK_LIMIT])
+
+
+def _stats(sales, total_items, active_sales_personnel, low_stock_items):
+    return {
+        "totalItems": total_items,
+        "totalSales": sales.total_sales,
+        "totalRevenue": sales.total_revenue,
+        "activeSalesPersonnel": active_sales_personnel,
+        "lowStockItems": low_stock_items,
+    }
+
+
+DASHBOARD_QUERIES = (get_sales_totals, _count_products, _count_active_salespeople, _low_stock_items)
+
+
+def compute_dashboard_stats():
+    """Collect the dashboard figures; sale totals are an O(1) counter read"""
+    return _stats(*(query() for query in DASHBOARD_QUERIES))
+
+
+def _in_worker_thread(query):
+    """
+    Run ``query`` on a pool thread with its own connection.
+
+    Django's async ORM sends every query through the one thread-sensitive
+    executor, so the dashboard queries would still run back to back.
+    """
+    def run():
+        close_old_connections()
+        try:
+            return query()
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)()
+
+
+async def acompute_dashboard_stats():
+    """compute_dashboard_stats() with the independent queries run concurrently"""
+    return _stats(*await asyncio.gather(*(_in_worker_thread(query) for query in DASHBOARD_QUERIES)))
+
+
+def _snapshot_ttl():
+    return getattr(settings, 'DASHBOARD_STATS_TTL', 30)
+
+
+def _snapshot_age(snapshot):
+    return max(0.0, time.time() - snapshot['generated_at'])
+
+
+def get_dashboard_snapshot():
+    """
+    Return ``(stats, age_in_seconds)``, recomputing only when the cached
+    snapshot has expired or been invalidated by a Product/Sale write.
+    """
+    snapshot = cache.get(SNAPSHOT_CACHE_KEY)
+    if snapshot is None:
+        snapshot = {'stats': compute_dashboard_stats(), 'generated_at': time.time()}
+        cache.set(SNAPSHOT_CACHE_KEY, snapshot, _snapshot_ttl())
+    return snapshot['stats'], _snapshot_age(snapshot)
+
+
+async def aget_dashboard_snapshot():
+    snapshot = await cache.aget(SNAPSHOT_CACHE_KEY)
+    if snapshot is None:
+        snapshot = {'stats': await acompute_dashboard_stats(), 'generated_at': time.time()}
+        await cache.aset(SNAPSHOT_CACHE_KEY, snapshot, _snapshot_ttl())
+    return snapshot['stats'], _snapshot_age(snapshot)
+
+
+def invalidate_dashboard_snapshot():
+    cache.delete(SNAPSHOT_CACHE_KEY)
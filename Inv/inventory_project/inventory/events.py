@@ -0,0 +1,179 @@
+# inventory/events.py
+"""
+In-process publish/subscribe for the notification stream.
+
+Sync code (views, signals, commands) publishes events; each open SSE
+connection is an asyncio subscriber fed through its event loop. The most
+recent events are kept in a ring buffer so a reconnecting client can resume
+from its ``Last-Event-ID``. Event ids carry a per-process prefix: an id from
+another worker (or from before a restart) cannot be resumed and the client
+is told to reload instead.
+
+Events are written to the database rather than published by their
+writers, since those may be another worker or the check_stock_alerts cron
+job: Notification rows, and StreamEvent rows for everything else
+(low-stock transitions). While a stream is open, one EventPoller task per
+process reads the rows committed since its last poll and publishes them
+here.
+"""
+import asyncio
+import json
+import threading
+import uuid
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import Notification, StreamEvent
+
+
+class Subscriber:
+    def __init__(self, loop, max_pending):
+        self.loop = loop
+        self.queue = asyncio.Queue(max_pending)
+        self.overflowed = False
+
+    def deliver(self, event):
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The client fell behind; its stream ends and it resumes from the buffer
+            self.overflowed = True
+
+
+class EventBroker:
+    def __init__(self, buffer_size=1000, max_pending=100):
+        self.prefix = uuid.uuid4().hex[:8]
+        self.max_pending = max_pending
+        self._buffer = deque(maxlen=buffer_size)
+        self._last_sequence = 0
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event, data):
+        """Buffer an event and hand it to every subscriber; safe from any thread"""
+        with self._lock:
+            self._last_sequence += 1
+            item = (self._last_sequence, event, data)
+            self._buffer.append(item)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.deliver, item)
+            except RuntimeError:  # loop already closed
+                self.unsubscribe(subscriber)
+        return self.event_id(item[0])
+
+    def subscribe(self, last_event_id=None):
+        """
+        Register the running event loop as a subscriber.
+
+        Returns ``(subscriber, backlog)`` where ``backlog`` holds the buffered
+        events after ``last_event_id``, or ``None`` when that id cannot be
+        resumed from this process.
+        """
+        subscriber = Subscriber(asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            backlog = self._since(last_event_id) if last_event_id else []
+            self._subscribers.add(subscriber)
+        return subscriber, backlog
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def latest_event_id(self):
+        with self._lock:
+            return self.event_id(self._last_sequence)
+
+    def event_id(self, sequence):
+        return f'{self.prefix}-{sequence}'
+
+    def _since(self, last_event_id):
+        prefix, _, sequence = last_event_id.partition('-')
+        if prefix != self.prefix or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        oldest = self._buffer[0][0] if self._buffer else self._last_sequence + 1
+        if sequence < oldest - 1 or sequence > self._last_sequence:
+            return None  # evicted from the buffer, or never issued here
+        return [item for item in self._buffer if item[0] > sequence]
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+
+broker = EventBroker(
+    buffer_size=getattr(settings, 'EVENT_STREAM_BUFFER_SIZE', 1000),
+    max_pending=getattr(settings, 'EVENT_STREAM_MAX_PENDING', 100),
+)
+
+
+class EventPoller:
+    """Publish Notification and StreamEvent rows above the last ids seen, while anyone is subscribed"""
+
+    def __init__(self, broker, batch_size=500):
+        self.broker = broker
+        self.batch_size = batch_size
+        self.last_ids = None
+        self._task = None
+
+    async def start(self):
+        """Ensure the polling task runs on the current loop; call after subscribing"""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+        # Take the slot before awaiting so overlapping starts share one task
+        self._task = loop.create_task(self._run())
+        if self.last_ids is None:
+            # First stream in this process: only rows created from now on are
+            # news. Later restarts resume from last_ids, so a client that
+            # reconnects after every stream closed still gets the gap.
+            self.last_ids = await sync_to_async(self._latest_ids)()
+
+    async def _run(self):
+        while self.broker.subscriber_count:
+            await asyncio.sleep(getattr(settings, 'EVENT_STREAM_POLL_INTERVAL', 2))
+            if self.last_ids is not None:
+                await sync_to_async(self.poll)()
+
+    @staticmethod
+    def _latest_ids():
+        return {
+            'notification': Notification.objects.order_by('-pk').values_list('pk', flat=True).first() or 0,
+            'event': StreamEvent.objects.order_by('-pk').values_list('pk', flat=True).first() or 0,
+        }
+
+    def poll(self):
+        """Publish the rows committed since the last poll; returns how many"""
+        notifications = list(Notification.objects.filter(pk__gt=self.last_ids['notification']).order_by('pk').values(
+            'id', 'message', 'type', 'created_at'
+        )[:self.batch_size])
+        for row in notifications:
+            self.broker.publish('notification', row)
+        if notifications:
+            self.last_ids['notification'] = notifications[-1]['id']
+
+        events = list(StreamEvent.objects.filter(pk__gt=self.last_ids['event']).order_by('pk').values_list(
+            'pk', 'event', 'data'
+        )[:self.batch_size])
+        for _, event, data in events:
+            self.broker.publish(event, data)
+        if events:
+            self.last_ids['event'] = events[-1][0]
+        return len(notifications) + len(events)
+
+
+event_poller = EventPoller(broker)
+
+
+def purge_stream_events(older_than):
+    """Delete StreamEvent rows created before ``older_than``; returns how many"""
+    return StreamEvent.objects.filter(created_at__lt=older_than).delete()[0]
+
+
+def format_event(event_id, event, data):
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,193 @@
+# inventory/exports.py
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+
+EXPORT_CHUNK_SIZE = 2000
+
+SALE_EXPORT_COLUMNS = [
+    ('ID', 'id'),
+    ('Date', 'date'),
+    ('Salesperson', 'user__email'),
+    ('Product', 'product__name'),
+    ('SKU', 'product__sku'),
+    ('Customer', 'customer__name'),
+    ('Quantity', 'quantity'),
+    ('Amount', 'amount'),
+    ('Status', 'status'),
+]
+NUMERIC_COLUMNS = {'id', 'quantity', 'amount'}
+
+
+def sale_export_rows(queryset):
+    """
+    Yield one tuple per sale, oldest first.
+
+    The related names come from the same JOINed query and rows are fetched
+    from a server-side cursor ``EXPORT_CHUNK_SIZE`` at a time, so memory stays
+    flat however many sales match.
+    """
+    lookups = [lookup for _, lookup in SALE_EXPORT_COLUMNS]
+    return queryset.order_by('date', 'id').values_list(*lookups).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+async def aiter_chunks(chunks):
+    """
+    Serve a sync chunk generator to ASGI one chunk at a time.
+
+    Django consumes a sync iterator whole before sending it over ASGI, so
+    each chunk is pulled with its own ``sync_to_async`` call instead. The
+    calls are thread-sensitive, keeping the server-side cursor on the
+    thread whose connection opened it.
+    """
+    chunks = iter(chunks)
+    done = object()
+    try:
+        while (chunk := await sync_to_async(next)(chunks, done)) is not done:
+            yield chunk
+    finally:
+        # Close the cursor too when the client disconnects mid-download
+        await sync_to_async(chunks.close)()
+
+
+class _Buffer:
+    """Write-only file object whose contents are handed out and cleared by ``drain()``"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([title for title, _ in SALE_EXPORT_COLUMNS])
+    batch = []
+    for row in rows:
+        batch.append(writer.writerow(row))
+        if len(batch) >= EXPORT_CHUNK_SIZE:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+_ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sales" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _xlsx_row(row_number, values, numeric):
+    cells = []
+    for index, value in enumerate(values):
+        ref = f'{_column_letter(index)}{row_number}'
+        if value is None:
+            continue
+        if numeric[index]:
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        else:
+            text = escape(_ILLEGAL_XML.sub('', str(value)))
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{text}</t></is></c>')
+    return f'<row r="{row_number}">{"".join(cells)}</row>'
+
+
+def stream_xlsx(rows):
+    """
+    Stream a single-sheet workbook without holding it in memory.
+
+    The zip is written to a drain-able buffer; because the buffer cannot
+    seek, ``zipfile`` emits data descriptors after each member, and the
+    worksheet member is deflated row by row as the query yields them.
+    """
+    buffer = _Buffer()
+    archive = zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED)
+    for name, content in _XLSX_STATIC_PARTS.items():
+        archive.writestr(name, content)
+    yield buffer.drain()
+
+    header = [title for title, _ in SALE_EXPORT_COLUMNS]
+    numeric = [lookup in NUMERIC_COLUMNS for _, lookup in SALE_EXPORT_COLUMNS]
+    with archive.open('xl/worksheets/sheet1.xml', mode='w', force_zip64=True) as sheet:
+        sheet.write((
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            + _xlsx_row(1, header, [False] * len(header))
+        ).encode())
+        batch = []
+        for row_number, row in enumerate(rows, start=2):
+            batch.append(_xlsx_row(row_number, row, numeric))
+            if len(batch) >= EXPORT_CHUNK_SIZE:
+                sheet.write(''.join(batch).encode())
+                batch = []
+                yield buffer.drain()
+        sheet.write((''.join(batch) + '</sheetData></worksheet>').encode())
+    archive.close()
+    yield buffer.drain()
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv', 'csv'),
+    'xlsx': (stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
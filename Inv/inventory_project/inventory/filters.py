@@ -0,0 +1,138 @@
+# inventory/filters.py
+from datetime import datetime, time
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+class InvalidFilter(ValueError):
+    pass
+
+
+def _date_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise InvalidFilter(f"{name} must be a date (YYYY-MM-DD)")
+    return parsed
+
+
+def _id_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise InvalidFilter(f"{name} must be an id")
+
+
+def _bool_param(params, name):
+    value = params.get(name)
+    if value is None or value == '':
+        return None
+    value = value.lower()
+    if value in ('1', 'true', 'yes'):
+        return True
+    if value in ('0', 'false', 'no'):
+        return False
+    raise InvalidFilter(f"{name} must be true or false")
+
+
+def as_of_param(params, name):
+    """A datetime query param; a bare date means the end of that day"""
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None and parse_date(value) is not None:
+            parsed = datetime.combine(parse_date(value), time.max)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise InvalidFilter(f"{name} must be a date or datetime (YYYY-MM-DD[THH:MM])")
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def _names_param(params, name, allowed):
+    names = [value.strip() for value in params.get(name, '').split(',') if value.strip()]
+    if any(value not in allowed for value in names):
+        raise InvalidFilter(f"{name} must be a comma-separated subset of: {', '.join(allowed)}")
+    return list(dict.fromkeys(names))
+
+
+def fields_param(params, allowed):
+    """The ``fields`` query param (comma-separated, checked against ``allowed``); None for all fields"""
+    return _names_param(params, 'fields', allowed) or None
+
+
+def expand_param(params, allowed):
+    """The comma-separated ``expand`` query param, checked against ``allowed``"""
+    return _names_param(params, 'expand', allowed)
+
+
+def filter_products(queryset, params):
+    """
+    Apply ``q`` (name/SKU substring), ``category``, ``low_stock`` and
+    ``discontinued`` query params to a Product queryset.
+
+    ``q`` becomes ``UPPER(col) LIKE UPPER('%q%')``, which PostgreSQL serves
+    from the trigram indexes added in migration 0006; other backends fall
+    back to a plain LIKE scan.
+    """
+    q = params.get('q', '').strip()
+    category = params.get('category')
+    low_stock = _bool_param(params, 'low_stock')
+    discontinued = _bool_param(params, 'discontinued')
+    if q:
+        queryset = queryset.filter(Q(name__icontains=q) | Q(sku__icontains=q))
+    if category:
+        queryset = queryset.filter(category=category)
+    if low_stock:
+        queryset = queryset.low_stock()
+    if discontinued is not None:
+        queryset = queryset.filter(discontinued=discontinued)
+    return queryset
+
+
+def date_range(params):
+    """The ``start``/``end`` query params as ``(start, end)`` dates, either may be None"""
+    return _date_param(params, 'start'), _date_param(params, 'end')
+
+
+def filter_sales(queryset, params):
+    """
+    Apply ``start``/``end`` (inclusive dates), ``user``, ``product`` and
+    ``customer`` query params to a Sale or SalesDailyRollup queryset
+    """
+    start, end = date_range(params)
+    user = _id_param(params, 'user')
+    product = _id_param(params, 'product')
+    customer = _id_param(params, 'customer')
+    if start:
+        queryset = queryset.filter(date__gte=start)
+    if end:
+        queryset = queryset.filter(date__lte=end)
+    if user:
+        queryset = queryset.filter(user_id=user)
+    if product:
+        queryset = queryset.filter(product_id=product)
+    if customer:
+        queryset = queryset.filter(customer_id=customer)
+    return queryset
+
+
+def filter_sale_history(queryset, params):
+    """filter_sales() plus ``status``, which only Sale rows carry"""
+    queryset = filter_sales(queryset, params)
+    sale_status = params.get('status')
+    if sale_status:
+        queryset = queryset.filter(status=sale_status)
+    return queryset
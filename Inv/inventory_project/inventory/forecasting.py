@@ -0,0 +1,136 @@
+# inventory/forecasting.py
+"""
+Sales velocity and reorder points for the whole catalog in one pass.
+
+Per-product daily units come from the daily sales rollup in one grouped
+query and are held as three flat arrays (product index, day index, units);
+days without sales are simply absent. Exponentially weighted sums over
+those arrays are ``np.bincount`` calls with per-day weights, so the cost is
+proportional to the number of (product, day) pairs with sales, not to
+products x days.
+"""
+from datetime import timedelta
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import Product, SalesDailyRollup
+from .signals import products_changed
+
+LOAD_CHUNK_SIZE = 10000
+UPDATE_BATCH_SIZE = 2000
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def load_daily_units(product_ids, start, end):
+    """
+    ``(product_index, day_index, units)`` arrays for ``start``..``end``.
+
+    ``product_ids`` must be sorted; ``product_index`` points into it. Rows
+    are read from the cursor ``LOAD_CHUNK_SIZE`` at a time and each chunk is
+    converted to fixed-size arrays before the next is fetched, so only one
+    chunk of row tuples is alive at once.
+    """
+    rows = SalesDailyRollup.objects.filter(date__range=(start, end)).order_by().values(
+        'product_id', 'date'
+    ).annotate(units=Sum('units')).values_list('product_id', 'date', 'units')
+    rows = rows.iterator(chunk_size=LOAD_CHUNK_SIZE)
+    origin = np.datetime64(start, 'D')
+    product_chunks, day_chunks, unit_chunks = [], [], []
+    while chunk := list(islice(rows, LOAD_CHUNK_SIZE)):
+        count = len(chunk)
+        pids = np.fromiter((row[0] for row in chunk), dtype=np.int64, count=count)
+        product_chunks.append(np.searchsorted(product_ids, pids))
+        day_chunks.append((np.array([row[1] for row in chunk], dtype='datetime64[D]') - origin).astype(np.int64))
+        unit_chunks.append(np.fromiter((row[2] for row in chunk), dtype=np.float64, count=count))
+    if not unit_chunks:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, dtype=np.float64)
+    return np.concatenate(product_chunks), np.concatenate(day_chunks), np.concatenate(unit_chunks)
+
+
+def forecast(product_index, day_index, units, n_products, n_days, half_life_days, lead_time_days, service_z):
+    """
+    Velocity (units/day) and reorder point for every product.
+
+    Velocity is the exponentially weighted mean of daily units over
+    ``n_days`` (recent days weigh more, halving every ``half_life_days``);
+    the reorder point covers expected demand over the lead time plus
+    ``service_z`` standard deviations of it.
+    """
+    decay = 0.5 ** (1.0 / half_life_days)
+    # Weight of each day, newest (index n_days - 1) = 1
+    day_weights = decay ** np.arange(n_days - 1, -1, -1, dtype=np.float64)
+    total_weight = day_weights.sum()
+
+    weights = day_weights[day_index]
+    mean = np.bincount(product_index, weights=units * weights, minlength=n_products) / total_weight
+    # Variance from deviations rather than E[x^2] - mean^2, which cancels badly
+    # for steady sellers; days without sales each deviate by the full mean
+    idle_weight = total_weight - np.bincount(product_index, weights=weights, minlength=n_products)
+    idle_weight[idle_weight < 1e-9 * total_weight] = 0.0  # sold every day, up to rounding
+    deviation = units - mean[product_index]
+    variance = (
+        np.bincount(product_index, weights=deviation * deviation * weights, minlength=n_products)
+        + idle_weight * mean * mean
+    ) / total_weight
+    std = np.sqrt(np.maximum(variance, 0.0))
+
+    demand = mean * lead_time_days + service_z * std * np.sqrt(lead_time_days)
+    # Rounded first so float noise on a whole number doesn't ceil up by one
+    reorder_points = np.ceil(np.round(demand, 6))
+    return mean, reorder_points.astype(np.int64)
+
+
+def update_reorder_points(history_days=None, half_life_days=None, lead_time_days=None, service_z=None,
+                          apply_thresholds=False, today=None):
+    """
+    Recompute ``sales_velocity`` and ``reorder_point`` for the catalog and
+    ``bulk_update`` the products whose values changed. With
+    ``apply_thresholds`` the reorder point also becomes the
+    ``low_stock_threshold``. Returns the number of products updated.
+    """
+    history_days = history_days or _setting('FORECAST_HISTORY_DAYS', 90)
+    half_life_days = half_life_days or _setting('FORECAST_HALF_LIFE_DAYS', 14)
+    lead_time_days = lead_time_days or _setting('FORECAST_LEAD_TIME_DAYS', 7)
+    service_z = _setting('FORECAST_SERVICE_Z', 1.65) if service_z is None else service_z
+
+    end = today or timezone.localdate()
+    start = end - timedelta(days=history_days - 1)
+    current = list(Product.objects.order_by('pk').values_list(
+        'pk', 'sales_velocity', 'reorder_point', 'low_stock_threshold'
+    ))
+    if not current:
+        return 0
+    product_ids = np.fromiter((row[0] for row in current), dtype=np.int64, count=len(current))
+
+    velocity, reorder_points = forecast(
+        *load_daily_units(product_ids, start, end), n_products=len(current), n_days=history_days,
+        half_life_days=half_life_days, lead_time_days=lead_time_days, service_z=service_z,
+    )
+    velocity = np.round(velocity, 3)
+
+    changed = []
+    for (pk, old_velocity, old_point, old_threshold), new_velocity, new_point in zip(
+        current, velocity.tolist(), reorder_points.tolist()
+    ):
+        if old_velocity == new_velocity and old_point == new_point and (
+            not apply_thresholds or old_threshold == new_point
+        ):
+            continue
+        changed.append(Product(
+            pk=pk, sales_velocity=new_velocity, reorder_point=new_point,
+            low_stock_threshold=new_point if apply_thresholds else old_threshold,
+        ))
+
+    fields = ['sales_velocity', 'reorder_point'] + (['low_stock_threshold'] if apply_thresholds else [])
+    Product.objects.bulk_update(changed, fields, batch_size=UPDATE_BATCH_SIZE)
+    if changed:
+        products_changed()
+    return len(changed)
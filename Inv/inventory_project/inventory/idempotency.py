@@ -0,0 +1,108 @@
+# inventory/idempotency.py
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+MAX_KEY_LENGTH = 255
+
+
+def _fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _claim(scope, key, fingerprint, claim_ttl):
+    """
+    Insert the in-progress row for ``key``; returns ``None`` when this
+    request owns it now, else the row already holding the key.
+    """
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(
+                scope=scope, key=key, fingerprint=fingerprint, expires_at=now + claim_ttl,
+            )
+        return None
+    except IntegrityError:
+        pass
+    stored = IdempotencyKey.objects.filter(scope=scope, key=key).first()
+    if stored is not None and stored.expires_at <= now:
+        # Expired: take it over unless another retry got there first
+        taken = IdempotencyKey.objects.filter(pk=stored.pk, expires_at=stored.expires_at).update(
+            fingerprint=fingerprint, status=None, response=None, expires_at=now + claim_ttl,
+        )
+        if taken:
+            return None
+        stored = IdempotencyKey.objects.filter(pk=stored.pk).first()
+    # Gone again means the first attempt just failed; the client may retry
+    return stored or IdempotencyKey(fingerprint=fingerprint)
+
+
+def purge_expired_keys():
+    """Delete expired keys and answers; returns how many rows went"""
+    return IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()[0]
+
+
+def idempotent(scope):
+    """
+    Make a create handler safe to retry.
+
+    A request carrying an ``Idempotency-Key`` header claims the key by
+    inserting an IdempotencyKey row; the unique (scope, key) constraint lets
+    exactly one worker win. Once the handler answers, its status and body
+    are stored on the row for ``IDEMPOTENCY_KEY_TTL`` seconds and replayed
+    to any repeat. Reusing a key with a different body is rejected, and a
+    repeat that arrives while the first attempt is still running gets 409.
+    The claim itself only lives ``IDEMPOTENCY_CLAIM_TTL`` seconds, so a
+    worker that dies mid-request blocks retries for about a request
+    timeout, not a day. Requests without the header are handled as before.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            key = request.META.get(HEADER)
+            if not key:
+                return handler(view, request, *args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return Response({'error': 'Idempotency-Key is too long'}, status=status.HTTP_400_BAD_REQUEST)
+
+            ttl = timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 86400))
+            claim_ttl = timedelta(seconds=getattr(settings, 'IDEMPOTENCY_CLAIM_TTL', 60))
+            key = hashlib.sha256(key.encode()).hexdigest()
+            fingerprint = _fingerprint(request)
+
+            stored = _claim(scope, key, fingerprint, claim_ttl)
+            if stored is not None:
+                if stored.fingerprint != fingerprint:
+                    return Response({'error': 'Idempotency-Key was already used with a different request'},
+                                    status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+                if stored.status is None:
+                    return Response({'error': 'A request with this Idempotency-Key is still in progress'},
+                                    status=status.HTTP_409_CONFLICT)
+                return Response(stored.response, status=stored.status, headers={'Idempotent-Replayed': 'true'})
+
+            claimed = IdempotencyKey.objects.filter(scope=scope, key=key, fingerprint=fingerprint)
+            try:
+                response = handler(view, request, *args, **kwargs)
+            except Exception:
+                claimed.delete()
+                raise
+
+            if status.is_server_error(response.status_code):
+                # Let the client retry failures that may not have committed
+                claimed.delete()
+            else:
+                claimed.update(status=response.status_code, response=response.data, expires_at=timezone.now() + ttl)
+            return response
+        return wrapper
+    return decorator
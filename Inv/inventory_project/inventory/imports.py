@@ -0,0 +1,180 @@
+# inventory/imports.py
+import csv
+import io
+import json
+
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.fields import SkipField, empty
+from rest_framework.validators import UniqueValidator
+
+from .ledger import record_movements
+from .models import Product
+from .serializers import ProductSerializer
+from .signals import products_changed
+from .stock import announce_crossings, is_low_stock, low_stock_crossing
+
+IMPORT_BATCH_SIZE = 2000
+MAX_REPORTED_ERRORS = 1000
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+
+class InvalidImport(ValueError):
+    pass
+
+
+def detect_format(upload, requested=None):
+    if requested:
+        if requested not in IMPORT_FORMATS:
+            raise InvalidImport(f"type must be one of: {', '.join(IMPORT_FORMATS)}")
+        return requested
+    name = (upload.name or '').lower()
+    if name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in (upload.content_type or ''):
+        return 'ndjson'
+    return 'csv'
+
+
+def _read_csv(text):
+    reader = csv.DictReader(text)
+    if not reader.fieldnames or 'sku' not in reader.fieldnames:
+        raise InvalidImport("CSV header must include a sku column")
+    for row in reader:
+        # Blank cells count as missing: defaults for new products, stored values for existing ones
+        yield reader.line_num, {key: value for key, value in row.items() if key and value not in (None, '')}
+
+
+def _read_ndjson(text):
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_no, None
+            continue
+        yield line_no, row if isinstance(row, dict) else None
+
+
+def read_rows(upload, file_format):
+    """Yield ``(line number, dict or None)`` from an uploaded file without loading it whole"""
+    text = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+    try:
+        reader = _read_csv if file_format == 'csv' else _read_ndjson
+        yield from reader(text)
+    except UnicodeDecodeError:
+        raise InvalidImport("File must be UTF-8 encoded")
+    finally:
+        # Leave the upload open for Django to clean up
+        text.detach()
+
+
+class RowValidator:
+    """
+    Apply ProductSerializer's field rules to plain dicts.
+
+    The serializer is built once and its field objects reused for every row;
+    the sku uniqueness check is dropped because rows are upserted by sku.
+    """
+
+    def __init__(self):
+        fields = ProductSerializer().fields
+        self.fields = []
+        for name, field in fields.items():
+            if field.read_only:
+                continue
+            field.validators = [v for v in field.validators if not isinstance(v, UniqueValidator)]
+            self.fields.append((name, field))
+
+    def __call__(self, row):
+        values, errors = {}, {}
+        for name, field in self.fields:
+            try:
+                values[name] = field.run_validation(row.get(name, empty))
+            except SkipField:
+                pass
+            except serializers.ValidationError as e:
+                errors[name] = e.detail
+        return values, errors
+
+
+def _upsert(batch):
+    # Lock the rows being replaced so the ledger sees the quantity they had
+    existing = {
+        sku: row for sku, *row in Product.objects.select_for_update().filter(sku__in=batch).values_list(
+            'sku', 'quantity', 'low_stock_threshold', 'discontinued'
+        )
+    }
+    # Rows are upserted in groups sharing the same columns, so a column a row
+    # leaves out (or blank) keeps its stored value instead of the model default
+    groups = {}
+    for values in batch.values():
+        groups.setdefault(frozenset(values), []).append(values)
+    movements, crossings = [], []
+    for columns, rows in groups.items():
+        products = Product.objects.bulk_create(
+            [Product(**values) for values in rows],
+            update_conflicts=True,
+            unique_fields=['sku'],
+            update_fields=sorted(columns - {'sku'}),
+        )
+        # Upserts return their primary keys on PostgreSQL and SQLite
+        for product, values in zip(products, rows):
+            stored = existing.get(product.sku)
+            if stored is None:
+                movements.append((product.pk, product.quantity, 'import'))
+                continue
+            quantity, threshold, discontinued = stored
+            movements.append((product.pk, product.quantity - quantity, 'import'))
+            before = Product(quantity=quantity, low_stock_threshold=threshold, discontinued=discontinued)
+            after = Product(
+                pk=product.pk, sku=product.sku, quantity=product.quantity,
+                low_stock_threshold=values.get('low_stock_threshold', threshold),
+                discontinued=values.get('discontinued', discontinued),
+            )
+            crossings.append(low_stock_crossing(after, after.quantity, is_low_stock(before)))
+    record_movements('import', movements)
+    announce_crossings(filter(None, crossings))
+    return len(batch) - len(existing), len(existing)
+
+
+def import_products(rows, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Validate and upsert product rows by sku.
+
+    Valid rows are collected into batches of ``batch_size`` and written with
+    one ``INSERT ... ON CONFLICT (sku) DO UPDATE`` per distinct set of
+    columns; a column a row leaves out or blank keeps its stored value on
+    update. A sku repeated
+    within a batch keeps its last row. Invalid rows are skipped and reported.
+    """
+    validate = RowValidator()
+    report = {'created': 0, 'updated': 0, 'rejected': 0, 'errors': []}
+    batch = {}
+
+    def flush():
+        created, updated = _upsert(batch)
+        report['created'] += created
+        report['updated'] += updated
+        batch.clear()
+
+    with transaction.atomic():
+        for line_no, row in rows:
+            if row is None:
+                values, errors = None, {'non_field_errors': ['Row is not a JSON object']}
+            else:
+                values, errors = validate(row)
+            if errors:
+                report['rejected'] += 1
+                if len(report['errors']) < MAX_REPORTED_ERRORS:
+                    report['errors'].append({'row': line_no, 'sku': (row or {}).get('sku'), 'errors': errors})
+                continue
+            batch[values['sku']] = values
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+        if report['created'] or report['updated']:
+            products_changed()
+
+    report['errors_truncated'] = report['rejected'] > len(report['errors'])
+    return report
@@ -0,0 +1,86 @@
+# inventory/ledger.py
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Exists, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Product, StockMovement, StockSnapshot
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+LEDGER_BATCH_SIZE = 1000
+# Movements are stamped before their transaction commits; snapshots stay this
+# far behind "now" so a slow transaction cannot land behind one.
+SNAPSHOT_LAG = timedelta(minutes=5)
+
+
+def record_movements(kind, changes):
+    """
+    Append one movement per ``(product_id, delta, reference)``.
+
+    Call inside the transaction that changes ``Product.quantity``; zero
+    deltas are skipped.
+    """
+    movements = [
+        StockMovement(product_id=product_id, kind=kind, delta=delta, reference=reference)
+        for product_id, delta, reference in changes if delta
+    ]
+    StockMovement.objects.bulk_create(movements)
+    return movements
+
+
+def with_ledger_stock(products, at=None):
+    """
+    Annotate ``products`` with ``stock``: their level at ``at`` (or now).
+
+    Starts from each product's latest snapshot at or before ``at`` and adds
+    only the movements recorded after it, so the ledger scan is bounded by
+    the snapshot interval rather than the product's whole history.
+    """
+    snapshots = StockSnapshot.objects.filter(product=OuterRef('pk'))
+    movements = StockMovement.objects.filter(product=OuterRef('pk'), created_at__gt=OuterRef('snapshot_at'))
+    if at is not None:
+        snapshots = snapshots.filter(taken_at__lte=at)
+        movements = movements.filter(created_at__lte=at)
+    snapshots = snapshots.order_by('-taken_at')
+    moved = movements.order_by().values('product').annotate(total=Sum('delta')).values('total')
+
+    return products.annotate(
+        snapshot_at=Coalesce(Subquery(snapshots.values('taken_at')[:1]), Value(EPOCH)),
+        snapshot_quantity=Coalesce(Subquery(snapshots.values('quantity')[:1]), 0),
+    ).annotate(
+        stock=F('snapshot_quantity') + Coalesce(Subquery(moved, output_field=IntegerField()), 0),
+        moved_since_snapshot=Exists(movements),
+    )
+
+
+def _batches(products, batch_size):
+    ids = list(products.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(ids), batch_size):
+        yield ids[start:start + batch_size]
+
+
+def take_snapshots(at=None, batch_size=LEDGER_BATCH_SIZE):
+    """Snapshot every product whose ledger moved since its last snapshot; returns the count written"""
+    at = at or timezone.now() - SNAPSHOT_LAG
+    written = 0
+    for ids in _batches(Product.objects.all(), batch_size):
+        rows = with_ledger_stock(Product.objects.filter(pk__in=ids), at).filter(
+            moved_since_snapshot=True
+        ).values_list('pk', 'stock')
+        with transaction.atomic():
+            created = StockSnapshot.objects.bulk_create([
+                StockSnapshot(product_id=pk, taken_at=at, quantity=stock) for pk, stock in rows
+            ])
+        written += len(created)
+    return written
+
+
+def find_drift(batch_size=LEDGER_BATCH_SIZE):
+    """Yield ``(product_id, sku, quantity, ledger_stock)`` where the ledger disagrees with the product"""
+    for ids in _batches(Product.objects.all(), batch_size):
+        rows = with_ledger_stock(Product.objects.filter(pk__in=ids)).exclude(
+            stock=F('quantity')
+        ).values_list('pk', 'sku', 'quantity', 'stock')
+        yield from rows
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from inventory.alerts import check_stock_alerts
+
+
+class Command(BaseCommand):
+    help = "Write notifications for products that went low on stock or are close to best-before (run on a schedule)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--expiry-days', type=int, default=getattr(settings, 'EXPIRY_ALERT_DAYS', 14),
+            help="Alert when best_before is within this many days",
+        )
+
+    def handle(self, *args, **options):
+        result = check_stock_alerts(expiry_days=options['expiry_days'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['low_stock']} low-stock alerts, {result['expiring']} expiry alerts, "
+            f"{result['recovered']} products back above threshold"
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from inventory.forecasting import update_reorder_points
+
+
+class Command(BaseCommand):
+    help = "Recompute sales velocity and suggested reorder points for every product from sales history"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--history-days', type=int, help="Days of sales history (FORECAST_HISTORY_DAYS)")
+        parser.add_argument('--half-life', type=float, help="Half-life in days of the weighting (FORECAST_HALF_LIFE_DAYS)")
+        parser.add_argument('--lead-time', type=float, help="Supplier lead time in days (FORECAST_LEAD_TIME_DAYS)")
+        parser.add_argument(
+            '--apply', action='store_true',
+            help="Also copy each suggested reorder point into low_stock_threshold",
+        )
+
+    def handle(self, *args, **options):
+        updated = update_reorder_points(
+            history_days=options['history_days'],
+            half_life_days=options['half_life'],
+            lead_time_days=options['lead_time'],
+            apply_thresholds=options['apply'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Updated forecasts for {updated} products"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from inventory.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = "Delete expired Idempotency-Key claims and stored responses (run on a schedule, e.g. hourly)"
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_keys()
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} expired idempotency keys"))
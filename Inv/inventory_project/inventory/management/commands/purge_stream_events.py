@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from inventory.events import purge_stream_events
+
+
+class Command(BaseCommand):
+    help = "Delete published notification-stream events older than --hours (run on a schedule, e.g. daily)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help="Keep events created within this many hours")
+
+    def handle(self, *args, **options):
+        deleted = purge_stream_events(timezone.now() - timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} stream events"))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from inventory.rollups import rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild SalesDailyRollup rows from the Sale table for a date range"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help="First date to rebuild (YYYY-MM-DD); defaults to the first sale")
+        parser.add_argument('--end', help="Last date to rebuild (YYYY-MM-DD); defaults to the last sale")
+        parser.add_argument('--workers', type=int, default=4, help="Date chunks rebuilt in parallel")
+        parser.add_argument('--days-per-chunk', type=int, default=31, help="Days rebuilt per transaction")
+
+    def handle(self, *args, **options):
+        start = self._date(options['start'], 'start')
+        end = self._date(options['end'], 'end')
+        if start and end and start > end:
+            raise CommandError("--start must not be after --end")
+        if options['workers'] < 1 or options['days_per_chunk'] < 1:
+            raise CommandError("--workers and --days-per-chunk must be positive")
+
+        def progress(chunk_start, chunk_end, written):
+            self.stdout.write(f"  {chunk_start} .. {chunk_end}: {written} rows")
+
+        total = rebuild_rollup(start, end, options['workers'], options['days_per_chunk'], progress)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} rollup rows"))
+
+    def _date(self, value, name):
+        if not value:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise CommandError(f"--{name} must be a date (YYYY-MM-DD)")
+        return parsed
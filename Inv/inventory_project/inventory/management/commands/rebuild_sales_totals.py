@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.dashboard import aggregate_sales_totals, get_sales_totals, invalidate_dashboard_snapshot, rebuild_sales_totals
+
+
+class Command(BaseCommand):
+    help = "Rebuild the dashboard sale count/revenue counters from the Sale table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only report drift between the counters and the Sale table; fail if they differ",
+        )
+
+    def handle(self, *args, **options):
+        count, revenue = aggregate_sales_totals()
+
+        if options['check']:
+            totals = get_sales_totals()
+            count_drift = totals.total_sales - count
+            revenue_drift = totals.total_revenue - revenue
+            if count_drift or revenue_drift:
+                raise CommandError(
+                    f"Drift: counters say {totals.total_sales} sales / {totals.total_revenue} revenue, "
+                    f"table has {count} / {revenue} (off by {count_drift} / {revenue_drift})"
+                )
+            self.stdout.write(self.style.SUCCESS(f"Counters match: {count} sales, {revenue} revenue"))
+            return
+
+        totals = rebuild_sales_totals()
+        invalidate_dashboard_snapshot()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt counters: {totals.total_sales} sales, {totals.total_revenue} revenue"
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from inventory.ledger import LEDGER_BATCH_SIZE, find_drift, record_movements
+
+
+class Command(BaseCommand):
+    help = "Check Product.quantity against the stock movement ledger, in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=LEDGER_BATCH_SIZE, help="Products per batch")
+        parser.add_argument(
+            '--fix', action='store_true',
+            help="Append adjustment movements so the ledger matches Product.quantity",
+        )
+
+    def handle(self, *args, **options):
+        drift = list(find_drift(batch_size=options['batch_size']))
+        for product_id, sku, quantity, stock in drift:
+            self.stdout.write(f"{sku} (#{product_id}): quantity {quantity}, ledger {stock} (off by {quantity - stock})")
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Ledger matches every product"))
+            return
+        if not options['fix']:
+            raise CommandError(f"{len(drift)} products disagree with the ledger")
+
+        with transaction.atomic():
+            record_movements('adjustment', [
+                (product_id, quantity - stock, 'reconcile') for product_id, _, quantity, stock in drift
+            ])
+        self.stdout.write(self.style.SUCCESS(f"Recorded {len(drift)} reconciling adjustments"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from inventory.ledger import LEDGER_BATCH_SIZE, take_snapshots
+
+
+class Command(BaseCommand):
+    help = "Snapshot per-product stock levels from the movement ledger (run periodically, e.g. nightly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=LEDGER_BATCH_SIZE, help="Products per batch")
+
+    def handle(self, *args, **options):
+        written = take_snapshots(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} stock snapshots"))
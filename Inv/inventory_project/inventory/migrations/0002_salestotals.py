@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:53
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def seed_sales_totals(apps, schema_editor):
+    Sale = apps.get_model('inventory', 'Sale')
+    SalesTotals = apps.get_model('inventory', 'SalesTotals')
+    totals = Sale.objects.aggregate(count=Count('id'), revenue=Sum('amount'))
+    SalesTotals.objects.create(pk=1, total_sales=totals['count'], total_revenue=totals['revenue'] or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesTotals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_sales', models.BigIntegerField(default=0)),
+                ('total_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_sales_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:53
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('inventory', '0002_salestotals'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['-timestamp'], name='auditlog_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['-join_date'], name='customer_join_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['-created_at'], name='notification_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.expressions.CombinedExpression(models.F('quantity'), '-', models.F('low_stock_threshold')), condition=models.Q(('discontinued', False)), name='product_low_stock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['-date', '-id'], name='sale_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_salesperson', True)), fields=['is_salesperson', 'is_active'], name='user_active_sales_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sale',
+            name='quantity',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
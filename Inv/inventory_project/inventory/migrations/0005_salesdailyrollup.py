@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_sale_quantity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('sale_count', models.IntegerField(default=0)),
+                ('units', models.IntegerField(default=0)),
+                ('amount_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('customer', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='inventory.customer')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='inventory.product')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'product', 'user', 'customer'], name='rollup_key_idx')],
+            },
+        ),
+    ]
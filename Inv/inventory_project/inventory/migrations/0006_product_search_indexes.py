@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:01
+
+from django.db import migrations, models
+
+# Django renders name__icontains on PostgreSQL as UPPER("name"::text) LIKE ...,
+# so the trigram indexes are built on that exact expression.
+TRIGRAM_INDEXES = {
+    'product_name_trgm_idx': 'name',
+    'product_sku_trgm_idx': 'sku',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON inventory_product '
+            f'USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_salesdailyrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category'], name='product_category_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
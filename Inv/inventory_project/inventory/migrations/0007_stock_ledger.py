@@ -0,0 +1,54 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_opening_balances(apps, schema_editor):
+    # Existing stock becomes one "initial" movement per product
+    Product = apps.get_model('inventory', 'Product')
+    StockMovement = apps.get_model('inventory', 'StockMovement')
+    batch = []
+    for product_id, quantity in Product.objects.exclude(quantity=0).values_list('pk', 'quantity').iterator():
+        batch.append(StockMovement(product_id=product_id, kind='initial', delta=quantity, reference='opening balance'))
+        if len(batch) >= 5000:
+            StockMovement.objects.bulk_create(batch)
+            batch = []
+    StockMovement.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_product_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('initial', 'Initial'), ('sale', 'Sale'), ('return', 'Return'), ('adjustment', 'Adjustment'), ('import', 'Import')], max_length=20)),
+                ('delta', models.IntegerField()),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='inventory.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', 'created_at'], name='stock_movement_product_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField()),
+                ('quantity', models.IntegerField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='inventory.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', '-taken_at'], name='stock_snapshot_product_idx')],
+            },
+        ),
+        migrations.RunPython(seed_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockAlertState',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='alert_state', serialize=False, to='inventory.product')),
+                ('low_stock', models.BooleanField(default=False)),
+                ('expiry_alerted_for', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('discontinued', False)), fields=['best_before'], name='product_best_before_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_stock_alerts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='reorder_point',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='sales_velocity',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 03:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_product_forecast'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['user', '-date', '-id'], name='sale_user_date_id_idx'),
+        ),
+    ]
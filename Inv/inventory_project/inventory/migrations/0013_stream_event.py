@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0012_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StreamEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(max_length=50)),
+                ('data', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at'], name='stream_event_created_idx')],
+            },
+        ),
+    ]
@@ -25,6 +25,16 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     USERNAME_FIELD = 'email'
 
+    class Meta:
+        indexes = [
+            # Dashboard "active sales personnel" count
+            models.Index(
+                fields=['is_salesperson', 'is_active'],
+                condition=models.Q(is_salesperson=True, is_active=True),
+                name='user_active_sales_idx',
+            ),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -67,6 +77,19 @@ class AccessToken(models.Model):
 
 from django.db import models
 
+
+class ProductQuerySet(models.QuerySet):
+    def low_stock(self):
+        """
+        Active products at or below their threshold. Written as
+        ``quantity - low_stock_threshold <= 0`` so it matches the partial
+        expression index on Product.
+        """
+        return self.filter(discontinued=False).annotate(
+            stock_margin=models.F('quantity') - models.F('low_stock_threshold')
+        ).filter(stock_margin__lte=0)
+
+
 class Product(models.Model):
     name = models.CharField(max_length=255)
     price = models.DecimalField(max_digits=10, decimal_places=2)
@@ -76,6 +99,24 @@ class Product(models.Model):
     sku = models.CharField(max_length=100, unique=True)
     discontinued = models.BooleanField(default=False)
     low_stock_threshold = models.IntegerField(default=10)
+    # Written by the forecast_reorder_points command (inventory/forecasting.py)
+    sales_velocity = models.FloatField(null=True, blank=True)
+    reorder_point = models.IntegerField(null=True, blank=True)
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['category'], name='product_category_idx'),
+            models.Index(
+                models.F('quantity') - models.F('low_stock_threshold'),
+                condition=models.Q(discontinued=False),
+                name='product_low_stock_idx',
+            ),
+            models.Index(
+                fields=['best_before'], condition=models.Q(discontinued=False), name='product_best_before_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -91,6 +132,11 @@ class Customer(models.Model):
     active = models.BooleanField(default=True)
     join_date = models.DateField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-join_date'], name='customer_join_date_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -101,10 +147,19 @@ class Sale(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     date = models.DateField(auto_now_add=True)
+    quantity = models.PositiveIntegerField(default=1)
+    # The line's discounted total before tax; checkout reports the tax separately
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=50)
     customer = models.ForeignKey(Customer, on_delete=models.SET_NULL, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-date', '-id'], name='sale_date_id_idx'),
+            # Per-salesperson history, paginated on (date, id)
+            models.Index(fields=['user', '-date', '-id'], name='sale_user_date_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user} - {self.product} - {self.amount}"
 
@@ -121,6 +176,11 @@ class Notification(models.Model):
     type = models.CharField(max_length=10, choices=TYPE_CHOICES)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at'], name='notification_created_idx'),
+        ]
+
     def __str__(self):
         return self.message
 
@@ -135,6 +195,11 @@ class AuditLog(models.Model):
     ip_address = models.GenericIPAddressField()
     details = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-timestamp'], name='auditlog_timestamp_idx'),
+        ]
+
     def __str__(self):
         return f"{self.type} by {self.user}"
 
@@ -153,3 +218,177 @@ class SystemSettings(models.Model):
 
     def __str__(self):
         return f"System Settings ({self.currency_code})"
+
+
+# inventory/models.py
+
+class SalesTotals(models.Model):
+    """Running sale count and revenue, kept in step with every Sale insert/delete"""
+    total_sales = models.BigIntegerField(default=0)
+    total_revenue = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.total_sales} sales, {self.total_revenue} revenue"
+
+
+# inventory/models.py
+
+class SalesDailyRollup(models.Model):
+    """
+    Per-day sale totals for one product/salesperson/customer combination.
+
+    Kept up to date as sales are created and deleted, so reports sum a few
+    rows per day instead of scanning Sale. The key is indexed but not unique:
+    a concurrent first insert may split a key over two rows, which leaves
+    every SUM() correct and is merged by the next rebuild.
+    """
+    date = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    customer = models.ForeignKey(Customer, on_delete=models.SET_NULL, null=True)
+    sale_count = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+    amount_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'product', 'user', 'customer'], name='rollup_key_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.product_id}/{self.user_id}: {self.amount_total}"
+
+
+# inventory/models.py
+
+class StockMovement(models.Model):
+    """
+    One change to a product's stock level.
+
+    Rows are only ever appended, in the same transaction as the change to
+    ``Product.quantity``, so the deltas of a product sum to its quantity.
+    """
+    KIND_CHOICES = [
+        ('initial', 'Initial'),
+        ('sale', 'Sale'),
+        ('return', 'Return'),
+        ('adjustment', 'Adjustment'),
+        ('import', 'Import'),
+    ]
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    delta = models.IntegerField()
+    reference = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'created_at'], name='stock_movement_product_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.delta:+d} ({self.product_id})"
+
+
+# inventory/models.py
+
+class StockSnapshot(models.Model):
+    """A product's stock level at ``taken_at``, summed from the ledger up to then"""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    taken_at = models.DateTimeField()
+    quantity = models.IntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', '-taken_at'], name='stock_snapshot_product_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} @ {self.taken_at}: {self.quantity}"
+
+
+# inventory/models.py
+
+class StockAlertState(models.Model):
+    """
+    What the alert check last notified about a product, so each low-stock
+    or expiry condition produces one Notification rather than one per run.
+    """
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='alert_state')
+    low_stock = models.BooleanField(default=False)
+    expiry_alerted_for = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Alert state for {self.product_id}"
+
+
+# inventory/models.py
+
+class CollectionVersion(models.Model):
+    """
+    Change counter for an API collection ('products', 'customers', ...),
+    bumped after each committed write and served as the list's ETag.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+# inventory/models.py
+
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class IdempotencyKey(models.Model):
+    """
+    An ``Idempotency-Key`` claimed by a create request and, once answered,
+    the response replayed to retries. The unique (scope, key) pair makes the
+    claiming INSERT the arbiter between workers.
+    """
+    scope = models.CharField(max_length=50)
+    key = models.CharField(max_length=64)  # sha256 of the header value
+    fingerprint = models.CharField(max_length=64)
+    status = models.PositiveSmallIntegerField(null=True)  # null while the request is in progress
+    response = models.JSONField(null=True, encoder=JSONEncoder)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='idempotency_scope_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='idempotency_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.key[:12]} ({self.status or 'in progress'})"
+
+
+# inventory/models.py
+
+class StreamEvent(models.Model):
+    """
+    A notification-stream event that is not a Notification row, such as a
+    low-stock transition. Written in the transaction that caused it, so each
+    worker's stream poller publishes it once it commits; purge_stream_events
+    deletes old rows.
+    """
+    event = models.CharField(max_length=50)
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='stream_event_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event} #{self.pk}"
+
+
+# Register signal handlers (the app has no AppConfig.ready() hook)
+from . import signals  # noqa: E402,F401
@@ -0,0 +1,114 @@
+# inventory/pagination.py
+import base64
+import json
+from datetime import date
+
+from django.db.models import Q
+from rest_framework.settings import api_settings
+
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    """Encode the keyset position of the last row on a page as an opaque token"""
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list):
+        raise InvalidCursor(cursor)
+    return values
+
+
+def query_params(request):
+    # DRF requests and the plain HttpRequest seen by async views
+    return getattr(request, 'query_params', request.GET)
+
+
+def wants_cursor_page(request):
+    """Cursor mode is opt-in so existing clients keep receiving a plain list"""
+    params = query_params(request)
+    return 'cursor' in params or 'limit' in params
+
+
+def get_page_size(request):
+    try:
+        limit = int(query_params(request).get('limit') or api_settings.PAGE_SIZE)
+    except ValueError:
+        raise InvalidCursor('limit')
+    if limit < 1:
+        raise InvalidCursor('limit')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+class IdCursorPagination:
+    """
+    Keyset pagination over a queryset ordered by descending id.
+
+    Each page is a single ``WHERE id < last_id ORDER BY id DESC LIMIT n`` scan
+    on the primary key index, so the cost of a page does not grow with how
+    deep into the collection the client has scrolled.
+    """
+    ordering = ('-id',)
+
+    def cursor_values(self, row):
+        return [row.id]
+
+    def after(self, queryset, values):
+        if len(values) != 1 or not isinstance(values[0], int):
+            raise InvalidCursor(values)
+        return queryset.filter(id__lt=values[0])
+
+    def page_query(self, queryset, request):
+        limit = get_page_size(request)
+        cursor = query_params(request).get('cursor')
+        if cursor:
+            queryset = self.after(queryset, decode_cursor(cursor))
+        return queryset.order_by(*self.ordering)[:limit + 1], limit
+
+    def page(self, rows, limit):
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(self.cursor_values(rows[-1])) if has_more else None
+        return rows, next_cursor
+
+    def paginate(self, queryset, request):
+        page_query, limit = self.page_query(queryset, request)
+        return self.page(list(page_query), limit)
+
+    async def apaginate(self, queryset, request):
+        page_query, limit = self.page_query(queryset, request)
+        return self.page([row async for row in page_query], limit)
+
+
+class DateIdCursorPagination(IdCursorPagination):
+    """
+    Keyset pagination over ``(date, id)`` descending, for Sale history.
+
+    Served by the ``(-date, -id)`` indexes, including the per-salesperson
+    ``(user, -date, -id)`` one when filtered by user.
+    """
+    ordering = ('-date', '-id')
+
+    def cursor_values(self, row):
+        return [row.date.isoformat(), row.id]
+
+    def after(self, queryset, values):
+        if len(values) != 2 or not isinstance(values[1], int):
+            raise InvalidCursor(values)
+        try:
+            last_date = date.fromisoformat(values[0])
+        except (TypeError, ValueError):
+            raise InvalidCursor(values)
+        # date <= last_date bounds the index range scan; the OR only trims the first day
+        return queryset.filter(Q(date__lte=last_date), Q(date__lt=last_date) | Q(id__lt=values[1]))
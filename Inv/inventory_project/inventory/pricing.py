@@ -0,0 +1,207 @@
+# inventory/pricing.py
+"""
+Server-side pricing driven by ``SystemSettings.discount_rules`` and ``tax_rate``.
+
+Rules use the shape the admin settings screen already stores::
+
+    {"id": "1", "name": "Bulk Order", "type": "percentage" | "fixed",
+     "value": 10, "minAmount": 500, "maxAmount": null, "isActive": true}
+
+with optional targeting keys understood by this module:
+
+* ``sku`` or ``category`` (and optionally ``minQuantity``) make it a *line*
+  rule, applied to matching lines whose quantity reaches ``minQuantity``;
+* otherwise a rule with ``minAmount``/``maxAmount`` is an *order* rule,
+  applied when the order subtotal falls inside that range;
+* a rule with neither is a manual promotion, applied only when the quote
+  names its id.
+
+Only the best rule applies at each level; percentage rules take a share of
+the line (or order) subtotal and fixed rules a flat amount.
+"""
+import threading
+from bisect import bisect_right
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+CENT = Decimal('0.01')
+ZERO = Decimal('0')
+HUNDRED = Decimal('100')
+
+
+def _money(value):
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _decimal(value, default=None):
+    if value is None or value == '':
+        return default
+    try:
+        result = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return default
+    # NaN would make every comparison raise and Infinity price lines at infinity
+    return result if result.is_finite() else default
+
+
+def _rules_list(discount_rules):
+    if isinstance(discount_rules, dict):
+        discount_rules = discount_rules.get('rules', [])
+    return [rule for rule in discount_rules or [] if isinstance(rule, dict)]
+
+
+class _TierIndex:
+    """
+    Rules for one target (a SKU, a category or the whole order) sorted by
+    threshold, with running maxima so the best applicable percentage and
+    fixed discount for any quantity/amount is one ``bisect``.
+    """
+
+    def __init__(self, rules):
+        self.rules = sorted(rules, key=lambda rule: rule[0])
+        self.thresholds = [threshold for threshold, _, _, _ in self.rules]
+        self.has_ceilings = any(ceiling is not None for _, _, _, ceiling in self.rules)
+        self.best_percent = []
+        self.best_fixed = []
+        best_percent = best_fixed = ZERO
+        for _, kind, value, _ in self.rules:
+            if kind == 'percentage':
+                best_percent = max(best_percent, value)
+            else:
+                best_fixed = max(best_fixed, value)
+            self.best_percent.append(best_percent)
+            self.best_fixed.append(best_fixed)
+
+    def best_discount(self, measure, subtotal):
+        """Largest discount among rules whose threshold ``measure`` reaches"""
+        position = bisect_right(self.thresholds, measure)
+        if not position:
+            return ZERO
+        if self.has_ceilings:
+            # Order rules may carry a maxAmount; fall back to a filtered scan
+            best = ZERO
+            for _, kind, value, ceiling in self.rules[:position]:
+                if ceiling is not None and measure > ceiling:
+                    continue
+                best = max(best, subtotal * value / HUNDRED if kind == 'percentage' else value)
+            return min(best, subtotal)
+        percent = self.best_percent[position - 1]
+        fixed = self.best_fixed[position - 1]
+        return min(max(subtotal * percent / HUNDRED, fixed), subtotal)
+
+
+class PricingEngine:
+    """Discount rules and tax rate compiled into lookup tables"""
+
+    def __init__(self, discount_rules, tax_rate):
+        self.tax_rate = _decimal(tax_rate, ZERO)
+        by_sku, by_category, order_rules = {}, {}, []
+        self.manual_rules = {}
+        for rule in _rules_list(discount_rules):
+            if not rule.get('isActive', True):
+                continue
+            kind = rule.get('type', 'percentage')
+            value = _decimal(rule.get('value'))
+            if kind not in ('percentage', 'fixed') or value is None or value <= 0:
+                continue
+            if rule.get('sku') or rule.get('category'):
+                entry = (_decimal(rule.get('minQuantity'), ZERO), kind, value, None)
+                if rule.get('sku'):
+                    by_sku.setdefault(str(rule['sku']), []).append(entry)
+                else:
+                    by_category.setdefault(str(rule['category']), []).append(entry)
+            elif rule.get('minAmount') is not None or rule.get('maxAmount') is not None:
+                order_rules.append((
+                    _decimal(rule.get('minAmount'), ZERO), kind, value, _decimal(rule.get('maxAmount')),
+                ))
+            elif rule.get('id') is not None:
+                self.manual_rules[str(rule['id'])] = (ZERO, kind, value, None)
+
+        self.by_sku = {sku: _TierIndex(rules) for sku, rules in by_sku.items()}
+        self.by_category = {category: _TierIndex(rules) for category, rules in by_category.items()}
+        self.order_rules = _TierIndex(order_rules)
+
+    def quote(self, lines, manual_rule_ids=()):
+        """
+        Price ``lines`` of ``(product, quantity)`` in one pass.
+
+        ``product`` needs ``price``, ``sku`` and ``category`` attributes.
+        Order-level discounts are spread over the lines in proportion to
+        their net amount, so each line ``total`` is what the sale records.
+        """
+        by_sku = self.by_sku
+        by_category = self.by_category
+        priced = []
+        subtotal = ZERO
+        for product, quantity in lines:
+            line_subtotal = product.price * quantity
+            discount = ZERO
+            index = by_sku.get(product.sku)
+            if index is not None:
+                discount = index.best_discount(quantity, line_subtotal)
+            index = by_category.get(product.category)
+            if index is not None:
+                discount = max(discount, index.best_discount(quantity, line_subtotal))
+            discount = _money(discount)
+            net = line_subtotal - discount
+            subtotal += net
+            priced.append({
+                'product': product.pk,
+                'sku': product.sku,
+                'quantity': quantity,
+                'unit_price': product.price,
+                'subtotal': _money(line_subtotal),
+                'discount': discount,
+                'total': net,
+            })
+
+        order_discount = self.order_rules.best_discount(subtotal, subtotal)
+        manual = [self.manual_rules[str(rule_id)] for rule_id in manual_rule_ids if str(rule_id) in self.manual_rules]
+        if manual:
+            order_discount = max(order_discount, _TierIndex(manual).best_discount(subtotal, subtotal))
+        order_discount = _money(order_discount)
+        self._spread(priced, subtotal, order_discount)
+
+        return {
+            'lines': priced,
+            'subtotal': _money(subtotal),
+            'order_discount': order_discount,
+            **self.charge(subtotal - order_discount),
+        }
+
+    def charge(self, net_total):
+        """Tax on a discounted, pre-tax amount and the tax-inclusive total a customer pays"""
+        tax = _money(net_total * self.tax_rate / HUNDRED)
+        return {'tax_rate': self.tax_rate, 'tax': tax, 'total': _money(net_total + tax)}
+
+    @staticmethod
+    def _spread(priced, subtotal, order_discount):
+        remaining = order_discount
+        for position, line in enumerate(priced):
+            if order_discount and subtotal:
+                if position == len(priced) - 1:
+                    share = remaining
+                else:
+                    share = _money(order_discount * line['total'] / subtotal)
+                    remaining -= share
+                line['discount'] += share
+                line['total'] -= share
+            line['total'] = _money(line['total'])
+
+
+_lock = threading.Lock()
+_compiled = {'settings': None, 'engine': None}
+
+
+def get_pricing_engine():
+    """The engine for the current settings version, compiled once per version"""
+    from .system_settings import get_system_settings
+
+    settings = get_system_settings()
+    with _lock:
+        if _compiled['settings'] is settings:
+            return _compiled['engine']
+    engine = PricingEngine(settings.discount_rules, settings.tax_rate)
+    with _lock:
+        _compiled['settings'] = settings
+        _compiled['engine'] = engine
+    return engine
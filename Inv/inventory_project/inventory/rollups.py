@@ -0,0 +1,145 @@
+# inventory/rollups.py
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek, TruncYear
+
+from .models import Sale, SalesDailyRollup
+
+REBUILD_BATCH_SIZE = 5000
+
+REPORT_PERIODS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'year': TruncYear,
+}
+
+
+def _rollup_key(date, product_id, user_id, customer_id):
+    return (date, product_id, user_id, customer_id)
+
+
+def apply_sales_to_rollup(sales, sign=1):
+    """
+    Add (``sign=1``) or remove (``sign=-1``) sales from the daily rollup.
+
+    Deltas are merged per key first, then the matching rows are locked and
+    updated with one ``bulk_update`` and missing keys inserted with one
+    ``bulk_create``, so a whole checkout costs a fixed number of queries.
+    """
+    deltas = defaultdict(lambda: [0, 0, Decimal('0')])
+    for sale in sales:
+        delta = deltas[_rollup_key(sale.date, sale.product_id, sale.user_id, sale.customer_id)]
+        delta[0] += sign
+        delta[1] += sign * sale.quantity
+        delta[2] += sign * Decimal(str(sale.amount))
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        existing = {}
+        rows = SalesDailyRollup.objects.select_for_update().filter(
+            date__in={key[0] for key in deltas},
+            product_id__in={key[1] for key in deltas},
+            user_id__in={key[2] for key in deltas},
+        ).order_by('id')
+        for row in rows:
+            existing.setdefault(_rollup_key(row.date, row.product_id, row.user_id, row.customer_id), row)
+
+        to_update, to_create = [], []
+        for key, (count, units, amount) in deltas.items():
+            row = existing.get(key)
+            if row is None:
+                if count < 0:
+                    # Nothing left to subtract from; never write a negative row
+                    continue
+                date, product_id, user_id, customer_id = key
+                to_create.append(SalesDailyRollup(
+                    date=date, product_id=product_id, user_id=user_id, customer_id=customer_id,
+                    sale_count=count, units=units, amount_total=amount,
+                ))
+            else:
+                row.sale_count += count
+                row.units += units
+                row.amount_total += amount
+                to_update.append(row)
+        if to_update:
+            SalesDailyRollup.objects.bulk_update(to_update, ['sale_count', 'units', 'amount_total'])
+        if to_create:
+            SalesDailyRollup.objects.bulk_create(to_create)
+
+
+def rebuild_rollup_range(start, end):
+    """Recompute the rollup rows for ``start``..``end`` (inclusive) from Sale"""
+    with transaction.atomic():
+        SalesDailyRollup.objects.filter(date__range=(start, end)).delete()
+        aggregated = Sale.objects.filter(date__range=(start, end)).order_by().values(
+            'date', 'product_id', 'user_id', 'customer_id'
+        ).annotate(
+            sale_count=Count('id'), units=Sum('quantity'), amount_total=Sum('amount')
+        ).iterator(chunk_size=REBUILD_BATCH_SIZE)
+
+        written = 0
+        batch = []
+        for row in aggregated:
+            batch.append(SalesDailyRollup(**row))
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                SalesDailyRollup.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        SalesDailyRollup.objects.bulk_create(batch)
+        return written + len(batch)
+
+
+def _rebuild_in_worker(chunk):
+    try:
+        return rebuild_rollup_range(*chunk)
+    finally:
+        # Each worker thread opened its own connection
+        connection.close()
+
+
+def split_date_range(start, end, days):
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + timedelta(days=days - 1), end)
+        yield chunk_start, chunk_end
+        chunk_start = chunk_end + timedelta(days=1)
+
+
+def rebuild_rollup(start=None, end=None, workers=4, days_per_chunk=31, progress=None):
+    """Rebuild the rollup for a date range, one transaction per chunk across ``workers`` threads"""
+    if start is None or end is None:
+        bounds = Sale.objects.aggregate(first=Min('date'), last=Max('date'))
+        start = start or bounds['first']
+        end = end or bounds['last']
+        if start is None or end is None:
+            return 0
+
+    chunks = list(split_date_range(start, end, days_per_chunk))
+    if workers <= 1:
+        results = (rebuild_rollup_range(*chunk) for chunk in chunks)
+        return _collect(chunks, results, progress)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return _collect(chunks, pool.map(_rebuild_in_worker, chunks), progress)
+
+
+def _collect(chunks, results, progress):
+    total = 0
+    for (chunk_start, chunk_end), written in zip(chunks, results):
+        total += written
+        if progress:
+            progress(chunk_start, chunk_end, written)
+    return total
+
+
+def sales_report(rollup_rows, period):
+    """Sale count, units and revenue per ``period`` summed from rollup rows"""
+    return rollup_rows.annotate(period=REPORT_PERIODS[period]('date')).values('period').annotate(
+        sales=Sum('sale_count'), units=Sum('units'), revenue=Sum('amount_total')
+    ).filter(sales__gt=0).order_by('period')
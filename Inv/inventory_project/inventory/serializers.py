@@ -70,17 +70,42 @@ class UserCreateSerializer(serializers.ModelSerializer):
 from rest_framework import serializers
 from .models import Product
 
-class ProductSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    ``fields=[...]`` limits the output to those fields (``?fields=`` on the
+    list endpoints). Pair with ``queryset.only(*Serializer.columns(fields))``
+    so the unused columns are not read either.
+    """
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def field_names(cls):
+        return list(cls().fields)
+
+    @classmethod
+    def columns(cls, fields):
+        """Model fields backing ``fields``, for ``.only()``"""
+        serializer_fields = cls().fields
+        model_fields = {field.name for field in cls.Meta.model._meta.concrete_fields}
+        return [serializer_fields[name].source for name in fields if serializer_fields[name].source in model_fields]
+
+
+class ProductSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = '__all__'
+        read_only_fields = ['sales_velocity', 'reorder_point']
 
 
 # inventory/serializers.py
 
 from .models import Customer
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Customer
         fields = '__all__'
@@ -89,12 +114,111 @@ class CustomerSerializer(serializers.ModelSerializer):
 
 from .models import Sale
 
-class SaleSerializer(serializers.ModelSerializer):
+class SaleProductSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Product
+        fields = ['id', 'name', 'sku', 'category', 'price']
+
+
+class SaleCustomerSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Customer
+        fields = ['id', 'name', 'email']
+
+
+class SaleUserSerializer(serializers.ModelSerializer):
+    # Deliberately not UserSerializer, which carries the access token
+    class Meta:
+        model = User
+        fields = ['id', 'email']
+
+
+class SaleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    A sale with plain foreign-key ids, or with ``expand`` (any of
+    SALE_EXPANSIONS) the named related rows nested in their place. Callers
+    expanding should ``select_related()`` the same names.
+    """
+    def __init__(self, *args, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in expand:
+            if name in self.fields:  # unless narrowed away by ``fields``
+                self.fields[name] = SALE_EXPANSIONS[name](read_only=True)
+
     class Meta:
         model = Sale
         fields = '__all__'
 
 
+SALE_EXPANSIONS = {
+    'product': SaleProductSerializer,
+    'customer': SaleCustomerSerializer,
+    'user': SaleUserSerializer,
+}
+
+
+def project_sales(sales, fields, expand):
+    """
+    Narrow a Sale queryset to ``fields`` and join the ``expand`` relations
+    still among them. Returns ``(queryset, expand)``.
+    """
+    if fields:
+        expand = [name for name in expand if name in fields]
+        # date also feeds the next-page cursor
+        sales = sales.only('date', *SaleSerializer.columns(fields))
+    # Expanded rows come from the same query through joins
+    return sales.select_related(*expand), expand
+
+
+class CheckoutItemSerializer(serializers.Serializer):
+    # Plain ids: the products are loaded and locked together by the checkout
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+
+
+class CheckoutSerializer(serializers.Serializer):
+    user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=False)
+    customer = serializers.PrimaryKeyRelatedField(queryset=Customer.objects.all(), required=False, allow_null=True)
+    status = serializers.CharField(max_length=50, default='completed')
+    items = CheckoutItemSerializer(many=True, allow_empty=False, max_length=500)
+    rules = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+
+
+class StockAdjustmentItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField(source='product', required=False)
+    sku = serializers.CharField(max_length=100, required=False)
+    delta = serializers.IntegerField(required=False)
+    quantity = serializers.IntegerField(min_value=0, required=False)
+
+    def validate(self, attrs):
+        if attrs.get('product') is None and not attrs.get('sku'):
+            raise serializers.ValidationError("Either id or sku is required.")
+        if (attrs.get('delta') is None) == (attrs.get('quantity') is None):
+            raise serializers.ValidationError("Give exactly one of delta or quantity.")
+        return attrs
+
+
+class StockAdjustmentSerializer(serializers.Serializer):
+    items = StockAdjustmentItemSerializer(many=True, allow_empty=False, max_length=5000)
+
+
+class PricingItemSerializer(serializers.Serializer):
+    product = serializers.IntegerField(required=False)
+    sku = serializers.CharField(max_length=100, required=False)
+    quantity = serializers.IntegerField(min_value=1)
+
+    def validate(self, attrs):
+        if attrs.get('product') is None and not attrs.get('sku'):
+            raise serializers.ValidationError("Either product or sku is required.")
+        return attrs
+
+
+class PricingQuoteSerializer(serializers.Serializer):
+    items = PricingItemSerializer(many=True, allow_empty=False, max_length=10000)
+    rules = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+
+
 # inventory/serializers.py
 
 from .models import Notification
@@ -0,0 +1,74 @@
+# inventory/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .abc_analysis import invalidate_abc_reports
+from .authentication import invalidate_user_tokens, token_cache
+from .dashboard import apply_sales_to_totals, invalidate_dashboard_snapshot
+from .models import Customer, Product, Sale, SystemSettings, User
+from .rollups import apply_sales_to_rollup
+from .system_settings import system_settings_changed
+from .versions import CUSTOMERS, PRODUCTS, SYSTEM_SETTINGS, bump_collection_version
+
+
+def products_changed():
+    """Bookkeeping after Product writes; bulk updates call this directly"""
+    invalidate_dashboard_snapshot()
+    bump_collection_version(PRODUCTS)
+
+
+def sales_created(sales):
+    """Bookkeeping for new Sale rows; bulk_create sends no signals so callers use this"""
+    apply_sales_to_totals(len(sales), sum(sale.amount for sale in sales))
+    apply_sales_to_rollup(sales)
+    invalidate_dashboard_snapshot()
+
+
+@receiver([post_save, post_delete], sender=Product)
+def product_changed(sender, **kwargs):
+    products_changed()
+
+
+@receiver(post_save, sender=Sale)
+def sale_saved(sender, instance, created, **kwargs):
+    if created:
+        sales_created([instance])
+    else:
+        invalidate_dashboard_snapshot()
+        invalidate_abc_reports()
+
+
+@receiver(post_delete, sender=Sale)
+def sale_deleted(sender, instance, origin=None, **kwargs):
+    apply_sales_to_totals(-1, -instance.amount)
+    # Deleting a product or user cascades to its sales and to its rollup rows
+    # in the same collector; those rows are already gone
+    origin_model = getattr(origin, 'model', type(origin))
+    if origin is None or origin_model is Sale:
+        apply_sales_to_rollup([instance], sign=-1)
+    invalidate_dashboard_snapshot()
+    invalidate_abc_reports()
+
+
+@receiver([post_save, post_delete], sender=Customer)
+def customer_changed(sender, **kwargs):
+    bump_collection_version(CUSTOMERS)
+
+
+@receiver([post_save, post_delete], sender=Token)
+def token_changed(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    # Covers deactivation, role changes and access token regeneration
+    if not created:
+        invalidate_user_tokens(instance)
+
+
+@receiver([post_save, post_delete], sender=SystemSettings)
+def settings_changed(sender, **kwargs):
+    system_settings_changed()
+    bump_collection_version(SYSTEM_SETTINGS)
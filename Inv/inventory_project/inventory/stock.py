@@ -0,0 +1,182 @@
+# inventory/stock.py
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+from .ledger import record_movements
+from .models import Product, Sale, StreamEvent
+from .pricing import get_pricing_engine
+from .signals import products_changed, sales_created
+
+
+class StockError(Exception):
+    pass
+
+
+class UnknownProducts(StockError):
+    def __init__(self, product_ids):
+        super().__init__(f"Unknown products: {product_ids}")
+        self.product_ids = product_ids
+
+
+class InsufficientStock(StockError):
+    def __init__(self, shortages):
+        super().__init__("Insufficient stock")
+        self.shortages = shortages
+
+
+def checkout(user, customer, items, status='completed', rules=()):
+    """
+    Record a multi-line order and take its stock in one transaction.
+
+    ``items`` is a list of ``{'product': id, 'quantity': n, 'amount': Decimal?}``.
+    The products are locked in id order, decremented by a single conditional
+    ``UPDATE ... SET quantity = CASE ...`` and the Sale rows are inserted with
+    one ``bulk_create``, so the query count does not depend on the number of
+    lines. Nothing is written if any product is unknown or short.
+
+    Lines without an explicit ``amount`` are priced by the discount/tax
+    engine; ``rules`` names manual promotions to apply to the order. Each
+    ``Sale.amount`` is the line's discounted, pre-tax total. Returns the
+    sales and ``{'net', 'tax_rate', 'tax', 'total'}`` for the order, where
+    ``total`` includes tax and matches /api/pricing/quote/ for the same lines.
+    """
+    requested = {}
+    for item in items:
+        requested[item['product']] = requested.get(item['product'], 0) + item['quantity']
+
+    with transaction.atomic():
+        products = Product.objects.select_for_update().in_bulk(sorted(requested))
+        missing = sorted(set(requested) - set(products))
+        if missing:
+            raise UnknownProducts(missing)
+
+        shortages = [
+            {'product': pid, 'requested': qty, 'available': products[pid].quantity}
+            for pid, qty in requested.items() if products[pid].quantity < qty
+        ]
+        if shortages:
+            raise InsufficientStock(shortages)
+
+        # The per-row guard keeps the decrement safe even on backends that
+        # ignore SELECT ... FOR UPDATE.
+        updated = Product.objects.filter(
+            reduce(or_, (Q(pk=pid, quantity__gte=qty) for pid, qty in requested.items()))
+        ).update(quantity=Case(
+            *(When(pk=pid, then=F('quantity') - qty) for pid, qty in requested.items()),
+            output_field=IntegerField(),
+        ))
+        if updated != len(requested):
+            current = dict(Product.objects.filter(pk__in=requested).values_list('pk', 'quantity'))
+            raise InsufficientStock([
+                {'product': pid, 'requested': qty, 'available': current.get(pid, 0)}
+                for pid, qty in requested.items() if current.get(pid, 0) < qty
+            ])
+
+        engine = get_pricing_engine()
+        quote = engine.quote([(products[item['product']], item['quantity']) for item in items], rules)
+        sales = Sale.objects.bulk_create([
+            Sale(
+                user=user,
+                customer=customer,
+                product=products[item['product']],
+                quantity=item['quantity'],
+                amount=item['amount'] if item.get('amount') is not None else line['total'],
+                status=status,
+            )
+            for item, line in zip(items, quote['lines'])
+        ])
+        record_movements('sale', [(sale.product_id, -sale.quantity, f'sale:{sale.pk}') for sale in sales])
+        announce_crossings(filter(None, (
+            low_stock_crossing(products[pid], products[pid].quantity - qty, is_low_stock(products[pid]))
+            for pid, qty in requested.items()
+        )))
+        sales_created(sales)
+        products_changed()
+    net = sum(sale.amount for sale in sales)
+    return sales, {'net': net, **engine.charge(net)}
+
+
+def is_low_stock(product, quantity=None):
+    quantity = product.quantity if quantity is None else quantity
+    return not product.discontinued and quantity <= product.low_stock_threshold
+
+
+def low_stock_crossing(product, quantity, was_low):
+    """Describe a change that moved ``product`` across its low-stock threshold, else ``None``"""
+    is_low = is_low_stock(product, quantity)
+    if is_low == was_low:
+        return None
+    return {
+        'id': product.pk, 'sku': product.sku, 'quantity': quantity,
+        'low_stock_threshold': product.low_stock_threshold,
+        'direction': 'below' if is_low else 'above',
+    }
+
+
+def announce_crossings(crossings):
+    """Queue low-stock transitions for every worker's stream; rolled back with the change that caused them"""
+    StreamEvent.objects.bulk_create([StreamEvent(event='low_stock', data=crossing) for crossing in crossings])
+
+
+def adjust_stock(adjustments):
+    """
+    Apply a stock-take in one transaction.
+
+    ``adjustments`` is a list of ``{'product': id}`` or ``{'sku': sku}`` with
+    either a ``delta`` or an absolute ``quantity``; several entries for one
+    product apply in order. The products are locked, the new levels computed
+    and written with one ``UPDATE ... SET quantity = CASE ...``. Returns the
+    new levels and the products whose change crossed ``low_stock_threshold``.
+    """
+    ids = {item['product'] for item in adjustments if item.get('product') is not None}
+    skus = {item['sku'] for item in adjustments if item.get('product') is None}
+
+    with transaction.atomic():
+        locked = Product.objects.select_for_update().filter(Q(pk__in=ids) | Q(sku__in=skus)).order_by('pk')
+        products = {}
+        lookup = {}
+        for product in locked.only('id', 'sku', 'quantity', 'low_stock_threshold', 'discontinued'):
+            products[product.pk] = product
+            lookup[('product', product.pk)] = lookup[('sku', product.sku)] = product
+
+        targets = []
+        for item in adjustments:
+            key = ('product', item['product']) if item.get('product') is not None else ('sku', item['sku'])
+            targets.append(lookup.get(key))
+        missing = [item.get('product', item.get('sku')) for item, product in zip(adjustments, targets) if product is None]
+        if missing:
+            raise UnknownProducts(missing)
+
+        levels = {}
+        for item, product in zip(adjustments, targets):
+            current = levels.get(product.pk, product.quantity)
+            levels[product.pk] = item['quantity'] if item.get('quantity') is not None else current + item['delta']
+
+        shortages = [
+            {'product': pid, 'requested': products[pid].quantity - qty, 'available': products[pid].quantity}
+            for pid, qty in levels.items() if qty < 0
+        ]
+        if shortages:
+            raise InsufficientStock(shortages)
+
+        Product.objects.filter(pk__in=levels).update(quantity=Case(
+            *(When(pk=pid, then=Value(qty)) for pid, qty in levels.items()),
+            output_field=IntegerField(),
+        ))
+        record_movements('adjustment', [
+            (pid, qty - products[pid].quantity, 'stock-take') for pid, qty in levels.items()
+        ])
+        products_changed()
+
+        result = {'products': [], 'crossed': []}
+        for pid, qty in levels.items():
+            product = products[pid]
+            result['products'].append({'id': pid, 'sku': product.sku, 'previous': product.quantity, 'quantity': qty})
+            crossing = low_stock_crossing(product, qty, is_low_stock(product))
+            if crossing:
+                result['crossed'].append(crossing)
+        announce_crossings(result['crossed'])
+    return result
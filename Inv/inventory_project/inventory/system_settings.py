@@ -0,0 +1,52 @@
+# inventory/system_settings.py
+import threading
+import time
+
+from django.conf import settings as django_settings
+
+from .models import SystemSettings
+from .versions import SYSTEM_SETTINGS, collection_version
+
+_lock = threading.Lock()
+_local = {'version': None, 'settings': None, 'checked_at': 0.0}
+
+
+def get_system_settings():
+    """
+    Return the SystemSettings row, loading it only when its version changed.
+
+    The system-settings collection version (bumped by the settings signal
+    after every committed write, and visible to every worker) is checked
+    at most once every ``SYSTEM_SETTINGS_CHECK_INTERVAL`` seconds per
+    process; in between, reads cost no query at all. The row (with its JSON
+    fields already decoded) is re-read from the database only when the
+    version moved. The returned instance is shared by the whole process and
+    must be treated as read-only; load the row yourself to modify it.
+    """
+    interval = getattr(django_settings, 'SYSTEM_SETTINGS_CHECK_INTERVAL', 5)
+    now = time.monotonic()
+    with _lock:
+        if _local['settings'] is not None and now - _local['checked_at'] < interval:
+            return _local['settings']
+
+    version = collection_version(SYSTEM_SETTINGS)
+    with _lock:
+        if _local['version'] == version and _local['settings'] is not None:
+            _local['checked_at'] = now
+            return _local['settings']
+
+    settings = SystemSettings.objects.first()
+    if settings is None:
+        settings = SystemSettings.objects.create()
+    with _lock:
+        _local['version'] = version
+        _local['settings'] = settings
+        _local['checked_at'] = now
+    return settings
+
+
+def system_settings_changed():
+    """Drop this process's copy; other workers reload once the version bump commits"""
+    with _lock:
+        _local['version'] = None
+        _local['settings'] = None
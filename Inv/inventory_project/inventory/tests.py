@@ -2,12 +2,53 @@
 Comprehensive test suite for Inventory Management System
 Testing all admin and sales functionalities from functionalities.txt
 """
-from django.test import TestCase
+import asyncio
+import csv
+import hashlib
+import io
+import tempfile
+import zipfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+from django.db import connection
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 import json
 
+from inventory import async_views
+from inventory.abc_analysis import abc_report
+from inventory.alerts import check_stock_alerts
+from inventory.audit import AuditSink
+from inventory.authentication import token_cache
+from inventory.dashboard import aget_dashboard_snapshot, compute_dashboard_stats, get_sales_totals
+from inventory.events import EventBroker, EventPoller, broker
+from inventory.forecasting import load_daily_units, update_reorder_points
+from inventory.pagination import encode_cursor
+from inventory.pricing import PricingEngine
+from inventory.stock import adjust_stock
+from inventory.ledger import take_snapshots
+from inventory.models import (
+    AuditLog, Customer, IdempotencyKey, Notification, Product, Sale, SalesDailyRollup, SalesTotals, StockMovement,
+    StockSnapshot, SystemSettings,
+)
+from inventory.system_settings import get_system_settings
+from inventory.versions import SYSTEM_SETTINGS, bump_collection_version
+from inventory.views import CustomerListCreateView, SaleExportView, notification_stream
+
 User = get_user_model()
 
 class AdminFunctionalitiesTests(APITestCase):
@@ -383,6 +424,1412 @@ class DatabaseIntegrityTests(TestCase):
         self.assertEqual(sales.role, 'sales')
 
 
+
+class ProductCursorPaginationTests(APITestCase):
+    """Test opt-in keyset pagination on the product list"""
+
+    def setUp(self):
+        self.client = APIClient()
+        for i in range(5):
+            Product.objects.create(
+                name=f'Paged Product {i}', sku=f'PAGE{i:03d}', price=10, quantity=20,
+                category='Paging', best_before='2025-12-31'
+            )
+
+    def test_cursor_walks_catalog_without_overlap(self):
+        """Test following next cursors visits every product exactly once"""
+        print("\n📄 Testing Product Cursor Pagination...")
+
+        seen = []
+        response = self.client.get('/api/products/', {'limit': 2})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get('/api/products/', {'limit': 2, 'cursor': response.data['next']})
+        print(f"✅ Pages walked: {len(seen)} products")
+        self.assertEqual(seen, sorted(Product.objects.values_list('id', flat=True), reverse=True))
+
+    def test_plain_list_without_cursor_params(self):
+        """Test clients that do not opt in still receive a plain list"""
+        response = self.client.get('/api/products/')
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 5)
+
+    def test_invalid_cursor_rejected(self):
+        """Test a malformed cursor returns 400"""
+        response = self.client.get('/api/products/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+
+
+class AuditSinkTests(TestCase):
+    """Test the batched audit writer"""
+
+    def _entry(self, action):
+        return AuditLog(type='TEST', user='System', action=action, ip_address='127.0.0.1')
+
+    def test_flush_writes_queued_events_in_batches(self):
+        """Test queued events are written together on flush"""
+        print("\n🗂️ Testing Audit Sink Flush...")
+
+        sink = AuditSink(batch_size=2, autostart=False)
+        for i in range(5):
+            sink.submit(self._entry(f'event {i}'))
+        self.assertEqual(AuditLog.objects.count(), 0)
+
+        sink.flush()
+        print(f"✅ Flushed: {sink.stats()}")
+        self.assertEqual(AuditLog.objects.count(), 5)
+        self.assertEqual(sink.stats()['written'], 5)
+
+    def test_full_queue_counts_dropped_events(self):
+        """Test events beyond the queue bound are dropped and counted"""
+        sink = AuditSink(max_queue_size=2, autostart=False)
+        for i in range(4):
+            sink.submit(self._entry(f'event {i}'))
+        self.assertEqual(sink.dropped, 2)
+        sink.flush()
+        self.assertEqual(AuditLog.objects.count(), 2)
+
+    def test_flush_leaves_callers_connection_alone(self):
+        """Test an explicit flush (e.g. from a request) doesn't recycle the caller's connection"""
+        sink = AuditSink(autostart=False)
+        sink.submit(self._entry('from a request'))
+        with mock.patch('inventory.audit.close_old_connections') as close:
+            sink.flush()
+        close.assert_not_called()
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+
+
+class DashboardSnapshotTests(APITestCase):
+    """Test the cached dashboard statistics snapshot"""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        Product.objects.create(
+            name='Snapshot Product', sku='SNAP001', price=5, quantity=2,
+            category='Snapshot', best_before='2025-12-31', low_stock_threshold=10
+        )
+
+    def test_snapshot_served_from_cache(self):
+        """Test repeat dashboard loads do not touch the database"""
+        print("\n📸 Testing Dashboard Snapshot Cache...")
+
+        first = self.client.get('/api/dashboard-stats/')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data['totalItems'], 1)
+        self.assertEqual(len(first.data['lowStockItems']), 1)
+
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/dashboard-stats/')
+        print(f"✅ Cached snapshot age: {second.data['snapshotAge']}s")
+        self.assertEqual(second.data['totalItems'], 1)
+
+    def test_product_write_invalidates_snapshot(self):
+        """Test creating a product refreshes the totals"""
+        self.client.get('/api/dashboard-stats/')
+        Product.objects.create(
+            name='Second Product', sku='SNAP002', price=5, quantity=50,
+            category='Snapshot', best_before='2025-12-31'
+        )
+        response = self.client.get('/api/dashboard-stats/')
+        self.assertEqual(response.data['totalItems'], 2)
+
+
+
+class SalesTotalsTests(TestCase):
+    """Test the incrementally maintained dashboard sale counters"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='counter@test.com', password='pass12345', is_salesperson=True)
+        self.product = Product.objects.create(
+            name='Counter Product', sku='COUNT001', price=10, quantity=100,
+            category='Counters', best_before='2025-12-31'
+        )
+
+    def _sale(self, amount):
+        return Sale.objects.create(user=self.user, product=self.product, amount=Decimal(amount), status='completed')
+
+    def test_counters_follow_sale_create_and_delete(self):
+        """Test counters move with every sale insert and delete"""
+        print("\n🧮 Testing Sales Counters...")
+
+        self._sale('10.00')
+        sale = self._sale('15.50')
+        totals = get_sales_totals()
+        print(f"✅ Counters after two sales: {totals}")
+        self.assertEqual(totals.total_sales, 2)
+        self.assertEqual(totals.total_revenue, Decimal('25.50'))
+
+        sale.delete()
+        totals = get_sales_totals()
+        self.assertEqual(totals.total_sales, 1)
+        self.assertEqual(totals.total_revenue, Decimal('10.00'))
+
+    def test_rebuild_command_check_and_repair(self):
+        """Test --check reports drift and a rebuild repairs it"""
+        self._sale('20.00')
+        SalesTotals.objects.update(total_sales=99)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_sales_totals', '--check', stdout=StringIO())
+
+        call_command('rebuild_sales_totals', stdout=StringIO())
+        call_command('rebuild_sales_totals', '--check', stdout=StringIO())
+        self.assertEqual(get_sales_totals().total_sales, 1)
+
+
+
+class SaleCheckoutTests(APITestCase):
+    """Test multi-line checkout with atomic stock decrement"""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        SystemSettings.objects.create(tax_rate=Decimal('10.00'))
+        self.user = User.objects.create_user(email='checkout@test.com', password='pass12345', is_salesperson=True)
+        self.products = [
+            Product.objects.create(
+                name=f'Checkout Product {i}', sku=f'CHK{i:03d}', price=Decimal('2.50'), quantity=10,
+                category='Checkout', best_before='2025-12-31'
+            )
+            for i in range(20)
+        ]
+
+    def _checkout(self, items):
+        return self.client.post('/api/sales/checkout/', {'user': self.user.id, 'items': items}, format='json')
+
+    def test_checkout_decrements_stock_and_records_sales(self):
+        """Test a checkout takes stock and writes one Sale per line"""
+        print("\n🛒 Testing Multi-line Checkout...")
+
+        first, second = self.products[:2]
+        response = self._checkout([
+            {'product': first.id, 'quantity': 3},
+            {'product': second.id, 'quantity': 1, 'amount': '2.00'},
+        ])
+        print(f"✅ Checkout: {response.status_code} - Total: {response.data.get('total')}")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['sales']), 2)
+        self.assertEqual(response.data['net'], Decimal('9.50'))
+        self.assertEqual(response.data['tax'], Decimal('0.95'))
+        self.assertEqual(response.data['total'], Decimal('10.45'))
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.quantity, second.quantity), (7, 9))
+        self.assertEqual(get_sales_totals().total_sales, 2)
+
+    def test_short_stock_rejects_whole_order(self):
+        """Test one short line rolls back every line"""
+        first, second = self.products[:2]
+        response = self._checkout([
+            {'product': first.id, 'quantity': 2},
+            {'product': second.id, 'quantity': 11},
+        ])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['shortages'][0]['product'], second.id)
+
+        first.refresh_from_db()
+        self.assertEqual(first.quantity, 10)
+        self.assertEqual(Sale.objects.count(), 0)
+
+    def test_query_count_independent_of_line_count(self):
+        """Test an 18-line order costs the same number of queries as a 2-line order"""
+        get_sales_totals()  # seed the counter and settings rows so both runs take the same path
+        get_system_settings()
+        with CaptureQueriesContext(connection) as small:
+            self._checkout([{'product': p.id, 'quantity': 1} for p in self.products[:2]])
+        with CaptureQueriesContext(connection) as large:
+            self._checkout([{'product': p.id, 'quantity': 1} for p in self.products[2:]])
+        print(f"✅ Queries: 2 lines={len(small)}, 18 lines={len(large)}")
+        self.assertEqual(len(small), len(large))
+
+
+
+class IdempotencyKeyTests(APITestCase):
+    """Test retried create requests are replayed instead of duplicated"""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        self.user = User.objects.create_user(email='retry@test.com', password='pass12345', is_salesperson=True)
+        self.product = Product.objects.create(
+            name='Retry Product', sku='RETRY001', price=5, quantity=10,
+            category='Retry', best_before='2025-12-31'
+        )
+        self.sale_data = {'user': self.user.id, 'product': self.product.id, 'amount': '5.00', 'status': 'completed'}
+
+    def test_retried_sale_is_replayed(self):
+        """Test the same key creates one sale and replays the response"""
+        print("\n🔁 Testing Idempotent Sale Retry...")
+
+        first = self.client.post('/api/sales/', self.sale_data, format='json', HTTP_IDEMPOTENCY_KEY='abc-123')
+        retry = self.client.post('/api/sales/', self.sale_data, format='json', HTTP_IDEMPOTENCY_KEY='abc-123')
+        print(f"✅ First: {first.status_code}, Retry: {retry.status_code} (replayed={retry.get('Idempotent-Replayed')})")
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.data['id'], first.data['id'])
+        self.assertEqual(Sale.objects.count(), 1)
+
+    def test_key_reuse_with_different_body_rejected(self):
+        """Test a key cannot be replayed for a different request"""
+        self.client.post('/api/sales/', self.sale_data, format='json', HTTP_IDEMPOTENCY_KEY='abc-456')
+        response = self.client.post('/api/sales/', {**self.sale_data, 'amount': '9.00'}, format='json',
+                                    HTTP_IDEMPOTENCY_KEY='abc-456')
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Sale.objects.count(), 1)
+
+    def test_claim_expires_sooner_than_response(self):
+        """Test the in-progress claim uses the short TTL and only the answer is kept for a day"""
+        with self.settings(IDEMPOTENCY_CLAIM_TTL=30, IDEMPOTENCY_KEY_TTL=86400):
+            self.client.post('/api/sales/', self.sale_data, format='json', HTTP_IDEMPOTENCY_KEY='abc-789')
+        stored = IdempotencyKey.objects.get()
+        self.assertEqual(stored.status, 201)
+        self.assertGreater(stored.expires_at, timezone.now() + timedelta(hours=23))
+
+    def test_claim_is_shared_between_workers(self):
+        """Test a key claimed elsewhere gets 409, and an expired claim is taken over"""
+        key = hashlib.sha256(b'abc-999').hexdigest()
+        fingerprint = hashlib.sha256(json.dumps(self.sale_data, sort_keys=True).encode()).hexdigest()
+        claim = IdempotencyKey.objects.create(
+            scope='sales', key=key, fingerprint=fingerprint, expires_at=timezone.now() + timedelta(seconds=60),
+        )
+        response = self.client.post('/api/sales/', self.sale_data, format='json', HTTP_IDEMPOTENCY_KEY='abc-999')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Sale.objects.count(), 0)
+
+        IdempotencyKey.objects.filter(pk=claim.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        response = self.client.post('/api/sales/', self.sale_data, format='json', HTTP_IDEMPOTENCY_KEY='abc-999')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Sale.objects.count(), 1)
+        call_command('purge_idempotency_keys', stdout=StringIO())
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def test_requests_without_key_unchanged(self):
+        """Test requests without the header still create every time"""
+        self.client.post('/api/sales/', self.sale_data, format='json')
+        self.client.post('/api/sales/', self.sale_data, format='json')
+        self.assertEqual(Sale.objects.count(), 2)
+
+
+
+class SaleExportTests(APITestCase):
+    """Test streamed CSV/XLSX sales exports"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='export@test.com', is_salesperson=True)
+        self.other = User.objects.create_user(email='other@test.com', is_salesperson=True)
+        product = Product.objects.create(
+            name='Export, "Quoted" Product', sku='EXP001', price=5, quantity=10,
+            category='Export', best_before='2025-12-31'
+        )
+        for user in (self.user, self.user, self.other):
+            Sale.objects.create(user=user, product=product, amount=Decimal('5.00'), status='completed')
+
+    def test_csv_export_filtered_by_salesperson(self):
+        """Test CSV export streams only the requested salesperson's sales"""
+        print("\n📤 Testing CSV Sales Export...")
+
+        response = self.client.get('/api/sales/export/', {'user': self.user.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        print(f"✅ CSV rows: {len(rows) - 1}")
+        self.assertEqual(rows[0][0], 'ID')
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1][3], 'Export, "Quoted" Product')
+
+    def test_xlsx_export_is_valid_workbook(self):
+        """Test XLSX export produces a readable zip with one row per sale"""
+        response = self.client.get('/api/sales/export/', {'type': 'xlsx'})
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row '), 4)
+        self.assertIn('Export, "Quoted" Product', sheet)
+
+    def test_export_streams_asynchronously_under_asgi(self):
+        """Test an ASGI request gets an async iterator instead of a buffered one"""
+        request = AsyncRequestFactory().get('/api/sales/export/', {'user': self.user.id})
+        response = SaleExportView.as_view()(request)
+        self.assertTrue(response.is_async)
+
+        async def collect():
+            return [chunk async for chunk in response.streaming_content]
+
+        rows = list(csv.reader(b''.join(async_to_sync(collect)()).decode().splitlines()))
+        self.assertEqual(len(rows), 3)
+
+    def test_invalid_date_rejected(self):
+        """Test a malformed date range returns 400"""
+        response = self.client.get('/api/sales/export/', {'start': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+
+
+class SalesRollupTests(APITestCase):
+    """Test the daily sales rollup and the reports read from it"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='rollup@test.com', is_salesperson=True)
+        self.product = Product.objects.create(
+            name='Rollup Product', sku='ROLL001', price=4, quantity=100,
+            category='Rollup', best_before='2025-12-31'
+        )
+
+    def _sale(self, amount, quantity=1):
+        return Sale.objects.create(user=self.user, product=self.product, quantity=quantity,
+                                   amount=Decimal(amount), status='completed')
+
+    def test_rollup_follows_sale_create_and_delete(self):
+        """Test sales are folded into one rollup row per day and key"""
+        print("\n📅 Testing Daily Sales Rollup...")
+
+        self._sale('4.00')
+        sale = self._sale('8.00', quantity=2)
+        row = SalesDailyRollup.objects.get()
+        print(f"✅ Rollup row: {row.sale_count} sales, {row.units} units, {row.amount_total}")
+        self.assertEqual((row.sale_count, row.units, row.amount_total), (2, 3, Decimal('12.00')))
+
+        sale.delete()
+        row.refresh_from_db()
+        self.assertEqual((row.sale_count, row.units, row.amount_total), (1, 1, Decimal('4.00')))
+
+    def test_rebuild_matches_incremental_rollup(self):
+        """Test the rebuild command reproduces the incrementally kept totals"""
+        self._sale('4.00')
+        self._sale('6.00')
+        SalesDailyRollup.objects.update(sale_count=0, amount_total=0)
+
+        call_command('rebuild_sales_rollup', '--workers', '1', stdout=StringIO())
+        row = SalesDailyRollup.objects.get()
+        self.assertEqual((row.sale_count, row.amount_total), (2, Decimal('10.00')))
+
+    def test_deleting_product_or_user_with_sales(self):
+        """Test cascaded sale deletes leave no rollup rows behind and keep the totals right"""
+        self._sale('4.00')
+        self._sale('6.00')
+        get_sales_totals()
+
+        response = self.client.delete(f'/api/products/{self.product.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(SalesDailyRollup.objects.exists())
+        self.assertEqual(get_sales_totals().total_sales, 0)
+        connection.check_constraints()
+
+        self.product = Product.objects.create(
+            name='Rollup Product 2', sku='ROLL002', price=4, quantity=100,
+            category='Rollup', best_before='2025-12-31'
+        )
+        self._sale('4.00')
+        self.assertEqual(self.client.delete(f'/api/users/{self.user.pk}/').status_code, 204)
+        self.assertFalse(SalesDailyRollup.objects.exists())
+        connection.check_constraints()
+
+    def test_monthly_report(self):
+        """Test the report endpoint sums rollup rows per month"""
+        self._sale('4.00')
+        self._sale('6.00')
+        response = self.client.get('/api/reports/sales/', {'period': 'month', 'user': self.user.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['sales'], 2)
+        self.assertEqual(response.data[0]['revenue'], Decimal('10.00'))
+
+
+
+class ProductSearchTests(APITestCase):
+    """Test server-side product search and filtering"""
+
+    def setUp(self):
+        self.client = APIClient()
+        rows = [
+            ('Green Tea', 'TEA-001', 'Drinks', 50, False),
+            ('Black Tea', 'TEA-002', 'Drinks', 3, False),
+            ('Teapot', 'POT-001', 'Kitchen', 1, True),
+            ('Coffee Beans', 'COF-001', 'Drinks', 40, False),
+        ]
+        for name, sku, category, quantity, discontinued in rows:
+            Product.objects.create(
+                name=name, sku=sku, category=category, quantity=quantity, discontinued=discontinued,
+                price=3, best_before='2025-12-31', low_stock_threshold=5
+            )
+
+    def _names(self, params):
+        response = self.client.get('/api/products/', params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(product['name'] for product in response.data)
+
+    def test_search_matches_name_and_sku(self):
+        """Test q matches names and SKUs case-insensitively"""
+        print("\n🔎 Testing Product Search...")
+
+        self.assertEqual(self._names({'q': 'tea'}), ['Black Tea', 'Green Tea', 'Teapot'])
+        self.assertEqual(self._names({'q': 'cof-'}), ['Coffee Beans'])
+
+    def test_filters_combine(self):
+        """Test category, low_stock and discontinued filters"""
+        self.assertEqual(self._names({'category': 'Drinks', 'q': 'tea'}), ['Black Tea', 'Green Tea'])
+        self.assertEqual(self._names({'low_stock': '1'}), ['Black Tea'])
+        self.assertEqual(self._names({'discontinued': 'true'}), ['Teapot'])
+
+    def test_filters_apply_to_cursor_pages(self):
+        """Test filtered results paginate with the cursor"""
+        response = self.client.get('/api/products/', {'category': 'Drinks', 'limit': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        response = self.client.get('/api/products/', {'category': 'Drinks', 'limit': 2, 'cursor': response.data['next']})
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+
+    def test_invalid_boolean_rejected(self):
+        """Test a malformed boolean filter returns 400"""
+        response = self.client.get('/api/products/', {'low_stock': 'maybe'})
+        self.assertEqual(response.status_code, 400)
+
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    """Test cached token lookups and their invalidation"""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        token_cache.clear_local()
+        self.user = User.objects.create_user(email='cachedauth@test.com', is_salesperson=True)
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_repeat_requests_skip_token_query(self):
+        """Test only the view's own query runs once the token is cached"""
+        print("\n🔑 Testing Cached Token Authentication...")
+
+        self.assertEqual(self.client.get('/api/notifications/').status_code, 200)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/notifications/')
+        print(f"✅ Cached auth request: {response.status_code}")
+        self.assertEqual(response.status_code, 200)
+
+    def test_logout_revokes_cached_token(self):
+        """Test a logged-out token is rejected immediately"""
+        self.client.get('/api/notifications/')
+        self.assertEqual(self.client.post('/api/logout/').status_code, 204)
+        self.assertEqual(self.client.get('/api/notifications/').status_code, 401)
+
+    def test_deactivation_revokes_cached_token(self):
+        """Test deactivating a user through the API evicts their cached token"""
+        self.client.get('/api/notifications/')
+        response = self.client.put(f'/api/users/{self.user.id}/', {'active': False}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/notifications/').status_code, 401)
+
+    def test_per_process_cache_keeps_tokens_local(self):
+        """Test a LocMemCache backend never holds tokens other workers would trust"""
+        self.client.get('/api/notifications/')
+        self.assertIsNone(cache.get(token_cache._cache_key(self.token.key)))
+        token_cache.clear_local()
+        with self.assertNumQueries(2):
+            self.client.get('/api/notifications/')
+
+    def test_shared_cache_backend_holds_tokens(self):
+        """Test a cache shared between workers serves tokens missing from the local tier"""
+        with tempfile.TemporaryDirectory() as location:
+            backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+            with self.settings(CACHES={'default': backend}):
+                self.client.get('/api/notifications/')
+                token_cache.clear_local()
+                with self.assertNumQueries(1):
+                    response = self.client.get('/api/notifications/')
+        self.assertEqual(response.status_code, 200)
+
+
+
+class SystemSettingsCacheTests(APITestCase):
+    """Test the process-local SystemSettings cache"""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        SystemSettings.objects.create(currency_code='GHS', tax_rate=Decimal('12.50'))
+
+    def test_repeat_reads_skip_database(self):
+        """Test the row is served from memory while the version is unchanged"""
+        print("\n⚙️ Testing Cached System Settings...")
+
+        self.assertEqual(get_system_settings().currency_code, 'GHS')
+        with self.assertNumQueries(0):
+            settings = get_system_settings()
+        print(f"✅ Cached settings: {settings}")
+
+    def test_update_reloads_settings(self):
+        """Test a settings update is visible on the next read"""
+        self.client.get('/api/system-settings/')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put('/api/system-settings/', {'currency_code': 'USD'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/system-settings/').data['currency_code'], 'USD')
+
+    def test_version_change_from_another_worker(self):
+        """Test a bumped version forces a reload"""
+        get_system_settings()
+        SystemSettings.objects.update(currency_code='EUR')  # bypasses signals like another process would
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_collection_version(SYSTEM_SETTINGS)
+        self.assertEqual(get_system_settings().currency_code, 'GHS')  # not re-checked yet
+        with self.settings(SYSTEM_SETTINGS_CHECK_INTERVAL=0):
+            with self.assertNumQueries(2):  # the version, then the row
+                self.assertEqual(get_system_settings().currency_code, 'EUR')
+            with self.assertNumQueries(1):
+                get_system_settings()
+
+
+class PricingEngineTests(APITestCase):
+    """Test discount and tax pricing from the system settings"""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        SystemSettings.objects.create(tax_rate=Decimal('10.00'), discount_rules=[
+            {'id': '1', 'name': 'Bulk Order', 'type': 'percentage', 'value': 10, 'minAmount': 100, 'isActive': True},
+            {'id': '2', 'name': 'Rice x10', 'type': 'percentage', 'value': 20, 'sku': 'RICE', 'minQuantity': 10,
+             'isActive': True},
+            {'id': '3', 'name': 'Grains', 'type': 'fixed', 'value': 1, 'category': 'Grains', 'isActive': True},
+            {'id': '4', 'name': 'New Customer', 'type': 'fixed', 'value': 5, 'isActive': True},
+            {'id': '5', 'name': 'Retired', 'type': 'percentage', 'value': 90, 'minAmount': 0, 'isActive': False},
+        ])
+        self.user = User.objects.create_user(email='pricing@test.com', is_salesperson=True)
+        self.rice = Product.objects.create(
+            name='Rice', sku='RICE', price=Decimal('5.00'), quantity=100, category='Grains', best_before='2025-12-31'
+        )
+        self.oil = Product.objects.create(
+            name='Oil', sku='OIL', price=Decimal('7.50'), quantity=100, category='Oils', best_before='2025-12-31'
+        )
+
+    def test_line_order_and_tax(self):
+        """Test line tiers, the order threshold and tax combine in one quote"""
+        print("\n🏷️ Testing Pricing Quote...")
+
+        response = self.client.post('/api/pricing/quote/', {'items': [
+            {'sku': 'RICE', 'quantity': 10},
+            {'product': self.oil.id, 'quantity': 8},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        rice, oil = response.data['lines']
+        # Rice: 50.00 less the 20% tier beats the 1.00 category discount
+        self.assertEqual(rice['subtotal'], Decimal('50.00'))
+        self.assertEqual(response.data['subtotal'], Decimal('100.00'))
+        self.assertEqual(response.data['order_discount'], Decimal('10.00'))
+        self.assertEqual(rice['total'] + oil['total'], Decimal('90.00'))
+        self.assertEqual(response.data['tax'], Decimal('9.00'))
+        self.assertEqual(response.data['total'], Decimal('99.00'))
+        print(f"✅ Quote total: {response.data['total']} {response.data['currency']}")
+
+    def test_manual_rule_and_unknown_product(self):
+        """Test promotions apply only when named and unknown products are rejected"""
+        items = [{'sku': 'OIL', 'quantity': 2}]
+        plain = self.client.post('/api/pricing/quote/', {'items': items}, format='json')
+        promo = self.client.post('/api/pricing/quote/', {'items': items, 'rules': ['4']}, format='json')
+        self.assertEqual(plain.data['order_discount'], Decimal('0.00'))
+        self.assertEqual(promo.data['order_discount'], Decimal('5.00'))
+
+        response = self.client.post('/api/pricing/quote/', {'items': [{'sku': 'NOPE', 'quantity': 1}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['products'], ['NOPE'])
+
+    def test_non_finite_rule_values_ignored(self):
+        """Test NaN and Infinity in admin-edited rules or the tax rate don't break pricing"""
+        engine = PricingEngine([
+            {'id': '6', 'type': 'percentage', 'value': 'NaN', 'minAmount': 0},
+            {'id': '7', 'type': 'fixed', 'value': 'Infinity', 'sku': 'OIL'},
+            {'id': '8', 'type': 'percentage', 'value': 5, 'minAmount': '-Infinity'},
+        ], 'NaN')
+        quote = engine.quote([(self.oil, 2)])
+        self.assertEqual(quote['order_discount'], Decimal('0.75'))  # a non-finite minAmount counts as unset
+        self.assertEqual(quote['lines'][0]['discount'], Decimal('0.75'))  # only the order share, no line rule
+        self.assertEqual((quote['tax'], quote['total']), (Decimal('0.00'), Decimal('14.25')))
+
+    def test_checkout_records_discounted_amounts(self):
+        """Test checkout prices lines without an explicit amount through the engine"""
+        response = self.client.post('/api/sales/checkout/', {'user': self.user.id, 'items': [
+            {'product': self.rice.id, 'quantity': 2},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['sales'][0]['amount'], '9.00')
+        self.assertEqual(response.data['net'], Decimal('9.00'))
+        self.assertEqual(response.data['total'], Decimal('9.90'))
+
+    def test_checkout_total_matches_quote(self):
+        """Test checkout charges the same tax-inclusive total the quote showed"""
+        items = [{'product': self.rice.id, 'quantity': 10}, {'product': self.oil.id, 'quantity': 8}]
+        quote = self.client.post('/api/pricing/quote/', {'items': items, 'rules': ['4']}, format='json')
+        response = self.client.post('/api/sales/checkout/', {
+            'user': self.user.id, 'items': items, 'rules': ['4'],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['tax'], quote.data['tax'])
+        self.assertEqual(response.data['total'], quote.data['total'])
+        self.assertEqual(response.data['net'], quote.data['subtotal'] - quote.data['order_discount'])
+
+
+class ProductImportTests(APITestCase):
+    """Test bulk product import from CSV and NDJSON uploads"""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        Product.objects.create(
+            name='Old Rice', sku='RICE', price=Decimal('4.00'), quantity=5,
+            category='Grains', best_before='2025-12-31', low_stock_threshold=3
+        )
+
+    def _upload(self, name, content, **params):
+        upload = SimpleUploadedFile(name, content.encode())
+        return self.client.post('/api/products/import/', {'file': upload, **params}, format='multipart')
+
+    def test_csv_upserts_by_sku_and_reports_errors(self):
+        """Test new skus are created, known skus updated and bad rows reported"""
+        print("\n📥 Testing CSV Product Import...")
+
+        response = self._upload('catalog.csv', (
+            "sku,name,price,quantity,category,best_before\n"
+            "RICE,Rice 5kg,5.50,40,Grains,2026-01-31\n"
+            "OIL,Oil 1L,7.25,12,Oils,2026-03-01\n"
+            "BAD,Bad Row,not-a-price,1,Oils,2026-03-01\n"
+            "NODATE,No Date,1.00,1,Oils,\n"
+        ))
+        print(f"✅ Import: {response.data['created']} created, {response.data['updated']} updated, "
+              f"{response.data['rejected']} rejected")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['rejected']), (1, 1, 2))
+        self.assertEqual([e['row'] for e in response.data['errors']], [4, 5])
+        self.assertIn('price', response.data['errors'][0]['errors'])
+        self.assertIn('best_before', response.data['errors'][1]['errors'])
+
+        rice = Product.objects.get(sku='RICE')
+        self.assertEqual((rice.name, rice.price, rice.quantity), ('Rice 5kg', Decimal('5.50'), 40))
+        self.assertEqual(rice.low_stock_threshold, 3)  # column not in the file keeps its value
+        self.assertEqual(AuditLog.objects.filter(type='IMPORT').count(), 1)
+
+    def test_ndjson_import_in_batches(self):
+        """Test NDJSON rows are written in batched upserts"""
+        lines = '\n'.join(json.dumps({
+            'sku': f'ND{i:04d}', 'name': f'Item {i}', 'price': '1.00', 'quantity': i,
+            'category': 'Bulk', 'best_before': '2026-01-01',
+        }) for i in range(250))
+        with CaptureQueriesContext(connection) as queries:
+            response = self._upload('catalog.ndjson', lines + '\nnot json\n')
+        self.assertEqual(response.data['created'], 250)
+        self.assertEqual(response.data['errors'][0]['row'], 251)
+        self.assertEqual(Product.objects.filter(category='Bulk').count(), 250)
+        self.assertLess(len(queries), 20)
+
+    def test_blank_cells_keep_stored_values(self):
+        """Test a blank optional cell leaves the stored value alone while other rows set it"""
+        Product.objects.filter(sku='RICE').update(low_stock_threshold=50)
+        response = self._upload('catalog.csv', (
+            "sku,name,price,quantity,category,best_before,low_stock_threshold\n"
+            "RICE,Rice 5kg,5.50,40,Grains,2026-01-31,\n"
+            "OIL,Oil 1L,7.25,12,Oils,2026-03-01,4\n"
+            "SALT,Salt,1.00,9,Spices,2026-03-01,\n"
+        ))
+        self.assertEqual((response.data['created'], response.data['updated']), (2, 1))
+        thresholds = dict(Product.objects.values_list('sku', 'low_stock_threshold'))
+        self.assertEqual(thresholds, {'RICE': 50, 'OIL': 4, 'SALT': 10})
+        self.assertEqual(Product.objects.get(sku='RICE').quantity, 40)
+
+    def test_missing_sku_column_rejected(self):
+        """Test a CSV without a sku column is refused"""
+        response = self._upload('catalog.csv', "name,price\nRice,1.00\n")
+        self.assertEqual(response.status_code, 400)
+
+
+class StockAdjustmentTests(APITestCase):
+    """Test bulk stock adjustments for stock-takes"""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        self.rice, self.oil, self.salt = [
+            Product.objects.create(
+                name=name, sku=sku, price=Decimal('1.00'), quantity=quantity,
+                category='Stock', best_before='2025-12-31', low_stock_threshold=10
+            )
+            for name, sku, quantity in [('Rice', 'RICE', 20), ('Oil', 'OIL', 5), ('Salt', 'SALT', 30)]
+        ]
+
+    def test_adjust_by_delta_and_absolute(self):
+        """Test deltas and absolute counts apply in one statement and report threshold crossings"""
+        print("\n📦 Testing Bulk Stock Adjustment...")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch('/api/products/stock/', [
+                {'sku': 'RICE', 'delta': -12},
+                {'id': self.oil.id, 'quantity': 40},
+                {'sku': 'SALT', 'delta': 5},
+                {'sku': 'SALT', 'delta': -1},
+            ], format='json')
+        self.assertEqual(response.status_code, 200)
+        levels = {row['sku']: row['quantity'] for row in response.data['products']}
+        self.assertEqual(levels, {'RICE': 8, 'OIL': 40, 'SALT': 34})
+        crossed = {row['sku']: row['direction'] for row in response.data['crossed']}
+        self.assertEqual(crossed, {'RICE': 'below', 'OIL': 'above'})
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('UPDATE "inventory_product"')]), 1)
+        print(f"✅ New levels: {levels}, crossed: {crossed}")
+
+        self.salt.refresh_from_db()
+        self.assertEqual(self.salt.quantity, 34)
+
+    def test_negative_result_rejects_all(self):
+        """Test a count below zero leaves every product untouched"""
+        response = self.client.patch('/api/products/stock/', {'items': [
+            {'sku': 'RICE', 'delta': 5},
+            {'sku': 'OIL', 'delta': -6},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.rice.refresh_from_db()
+        self.assertEqual(self.rice.quantity, 20)
+
+    def test_invalid_and_unknown_items(self):
+        """Test malformed and unknown items are rejected"""
+        response = self.client.patch('/api/products/stock/', [{'sku': 'RICE', 'delta': 1, 'quantity': 3}], format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch('/api/products/stock/', [{'sku': 'NOPE', 'delta': 1}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['products'], ['NOPE'])
+
+
+class StockLedgerTests(APITestCase):
+    """Test the stock movement ledger, snapshots and reconciliation"""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        self.user = User.objects.create_user(email='ledger@test.com', is_salesperson=True)
+        response = self.client.post('/api/products/', {
+            'name': 'Ledger Rice', 'sku': 'LEDGER', 'price': '2.00', 'quantity': 50,
+            'category': 'Ledger', 'best_before': '2025-12-31',
+        }, format='json')
+        self.product = Product.objects.get(pk=response.data['id'])
+
+    def test_every_quantity_change_is_recorded(self):
+        """Test create, checkout, stock-take and edit each append a movement"""
+        print("\n📒 Testing Stock Movement Ledger...")
+
+        self.client.post('/api/sales/checkout/', {
+            'user': self.user.id, 'items': [{'product': self.product.id, 'quantity': 4}],
+        }, format='json')
+        self.client.patch('/api/products/stock/', [{'sku': 'LEDGER', 'quantity': 40}], format='json')
+        self.client.put(f'/api/products/{self.product.id}/', {
+            'name': 'Ledger Rice', 'sku': 'LEDGER', 'price': '2.00', 'quantity': 45,
+            'category': 'Ledger', 'best_before': '2025-12-31',
+        }, format='json')
+
+        movements = list(StockMovement.objects.filter(product=self.product).order_by('id').values_list('kind', 'delta'))
+        print(f"✅ Movements: {movements}")
+        self.assertEqual(movements, [('initial', 50), ('sale', -4), ('adjustment', -6), ('adjustment', 5)])
+        call_command('reconcile_stock', stdout=StringIO())
+
+    def test_stock_as_of_uses_snapshot_and_later_movements(self):
+        """Test stock as of a past moment is the snapshot plus movements up to then"""
+        StockMovement.objects.filter(product=self.product).update(created_at=timezone.now() - timedelta(days=10))
+        take_snapshots(at=timezone.now() - timedelta(days=5))
+        self.client.patch('/api/products/stock/', [{'sku': 'LEDGER', 'delta': -20}], format='json')
+
+        self.assertEqual(StockSnapshot.objects.get(product=self.product).quantity, 50)
+        past = self.client.get('/api/products/stock/', {'as_of': (timezone.now() - timedelta(days=1)).isoformat()})
+        now = self.client.get('/api/products/stock/', {'q': 'LEDGER'})
+        self.assertEqual(past.data[0]['quantity'], 50)
+        self.assertEqual(now.data[0]['quantity'], 30)
+        self.assertEqual(self.client.get('/api/products/stock/', {'as_of': 'yesterday'}).status_code, 400)
+
+    def test_reconcile_detects_and_fixes_drift(self):
+        """Test an unrecorded quantity change is reported and can be reconciled"""
+        Product.objects.filter(pk=self.product.pk).update(quantity=47)
+        with self.assertRaises(CommandError):
+            call_command('reconcile_stock', stdout=StringIO())
+        call_command('reconcile_stock', '--fix', stdout=StringIO())
+        call_command('reconcile_stock', stdout=StringIO())
+
+
+class NotificationStreamTests(TransactionTestCase):
+    """Test the server-sent event stream for notifications and low-stock alerts"""
+
+    def setUp(self):
+        self.broker = EventBroker(buffer_size=3)
+
+    def test_broker_resumes_from_last_event_id(self):
+        """Test buffered events replay after a Last-Event-ID and evicted ids force a reset"""
+        print("\n📡 Testing Event Broker Resume...")
+
+        async def scenario():
+            ids = [self.broker.publish('notification', {'n': i}) for i in range(5)]
+            _, backlog = self.broker.subscribe(ids[2])
+            _, evicted = self.broker.subscribe(ids[0])
+            _, foreign = self.broker.subscribe('deadbeef-1')
+            subscriber, _ = self.broker.subscribe()
+            self.broker.publish('low_stock', {'sku': 'X'})
+            delivered = await asyncio.wait_for(subscriber.queue.get(), 1)
+            return backlog, evicted, foreign, delivered
+
+        backlog, evicted, foreign, delivered = async_to_sync(scenario)()
+        self.assertEqual([data['n'] for _, _, data in backlog], [3, 4])
+        self.assertIsNone(evicted)
+        self.assertIsNone(foreign)
+        self.assertEqual(delivered[1:], ('low_stock', {'sku': 'X'}))
+        print(f"✅ Replayed {len(backlog)} events after {self.broker.subscriber_count} subscriptions")
+
+    def test_stream_delivers_committed_notifications(self):
+        """Test the SSE endpoint sends notifications committed after it opened"""
+        async def read_stream():
+            response = await notification_stream(AsyncRequestFactory().get('/api/notifications/stream/'))
+            chunks = aiter(response.streaming_content)
+            await anext(chunks)  # retry interval
+            await sync_to_async(Notification.objects.create)(message='Stock take due', type='info')
+            body = (await asyncio.wait_for(anext(chunks), 5)).decode()
+            await chunks.aclose()
+            return response, body
+
+        with self.settings(EVENT_STREAM_POLL_INTERVAL=0.01):
+            response, body = async_to_sync(read_stream)()
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertIn('event: notification', body)
+        self.assertIn('Stock take due', body)
+        self.assertEqual(broker.subscriber_count, 0)
+
+    def test_alert_job_notifications_published_by_poll(self):
+        """Test notifications written outside this process's broker (the alerts job) are published once"""
+        poller = EventPoller(self.broker)
+        poller.last_ids = poller._latest_ids()
+        resume_from = self.broker.latest_event_id()
+        Product.objects.create(
+            name='Polled Rice', sku='POLL', price=Decimal('1.00'), quantity=2,
+            category='Stream', best_before='2030-12-31', low_stock_threshold=10
+        )
+        check_stock_alerts()
+        self.assertEqual(self.broker.latest_event_id(), resume_from)  # nothing published by the job itself
+        self.assertEqual(poller.poll(), 1)
+        self.assertEqual(poller.poll(), 0)
+
+        async def backlog():
+            subscriber, events = self.broker.subscribe(resume_from)
+            self.broker.unsubscribe(subscriber)
+            return events
+
+        [(_, event, data)] = async_to_sync(backlog)()
+        self.assertEqual(event, 'notification')
+        self.assertIn('Polled Rice', data['message'])
+
+    def test_poller_resumes_after_all_streams_close(self):
+        """Test notifications created while nobody was subscribed are published on the next start"""
+        poller = EventPoller(self.broker)
+
+        async def connect():
+            subscriber, _ = self.broker.subscribe()
+            await asyncio.gather(poller.start(), poller.start())
+            tasks = [task for task in asyncio.all_tasks() if task.get_coro().__qualname__ == 'EventPoller._run']
+            return subscriber, tasks
+
+        async def reconnect(resume_from):
+            subscriber, _ = self.broker.subscribe(resume_from)
+            await poller.start()
+            event = await asyncio.wait_for(subscriber.queue.get(), 5)
+            self.broker.unsubscribe(subscriber)
+            return event
+
+        with self.settings(EVENT_STREAM_POLL_INTERVAL=0.01):
+            subscriber, tasks = async_to_sync(connect)()
+            self.broker.unsubscribe(subscriber)  # the lone dashboard drops
+            resume_from = self.broker.latest_event_id()
+            Notification.objects.create(message='Created in the gap', type='info')
+            _, event, data = async_to_sync(reconnect)(resume_from)
+        self.assertEqual(len(tasks), 1)
+        self.assertEqual((event, data['message']), ('notification', 'Created in the gap'))
+
+    def test_stream_not_routed_under_wsgi(self):
+        """Test the stream is absent unless the ASGI async views are enabled"""
+        self.assertEqual(self.client.get('/api/notifications/stream/').status_code, 404)
+
+    def test_low_stock_transition_published(self):
+        """Test a stock-take that crosses the threshold queues one event for every worker's poller"""
+        Product.objects.create(
+            name='Stream Rice', sku='STREAM', price=Decimal('1.00'), quantity=20,
+            category='Stream', best_before='2025-12-31', low_stock_threshold=10
+        )
+        poller = EventPoller(self.broker)
+        poller.last_ids = poller._latest_ids()
+        APIClient().patch('/api/products/stock/', [{'sku': 'STREAM', 'delta': -15}], format='json')
+        APIClient().patch('/api/products/stock/', [{'sku': 'STREAM', 'delta': -1}], format='json')
+        self.assertEqual(self._polled(poller), [('low_stock', 'below')])
+
+    def test_import_announces_crossings(self):
+        """Test an import that moves a product across its threshold queues a low_stock event"""
+        Product.objects.create(
+            name='Import Oil', sku='IMPOIL', price=Decimal('1.00'), quantity=20,
+            category='Stream', best_before='2025-12-31', low_stock_threshold=10
+        )
+        poller = EventPoller(self.broker)
+        poller.last_ids = poller._latest_ids()
+        upload = SimpleUploadedFile('stock.csv', (
+            "sku,name,price,quantity,category,best_before\n"
+            "IMPOIL,Import Oil,1.00,4,Stream,2025-12-31\n"
+            "IMPNEW,New Item,1.00,1,Stream,2025-12-31\n"
+        ).encode())
+        APIClient().post('/api/products/import/', {'file': upload}, format='multipart')
+        self.assertEqual(self._polled(poller), [('low_stock', 'below')])
+
+    def _polled(self, poller):
+        resume_from = self.broker.latest_event_id()
+        poller.poll()
+
+        async def backlog():
+            subscriber, events = self.broker.subscribe(resume_from)
+            self.broker.unsubscribe(subscriber)
+            return events
+
+        return [(event, data['direction']) for _, event, data in async_to_sync(backlog)()]
+
+
+class AsyncReadViewTests(TransactionTestCase):
+    """Test the async read views match the synchronous API"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.factory = AsyncRequestFactory()
+        for i in range(3):
+            Product.objects.create(
+                name=f'Async Product {i}', sku=f'ASYNC{i}', price=Decimal('3.50'), quantity=i,
+                category='Async', best_before='2025-12-31', low_stock_threshold=1
+            )
+
+    def test_product_list_matches_sync_view(self):
+        """Test the async product list returns the same body, filters and cursor pages"""
+        print("\n⚡ Testing Async Product List...")
+
+        async def fetch(query):
+            response = await async_views.product_list(self.factory.get('/api/products/', query))
+            return json.loads(response.content)
+
+        for query in ({}, {'q': 'async 1'}, {'limit': 2}):
+            self.assertEqual(async_to_sync(fetch)(query), self.client.get('/api/products/', query).json())
+        print("✅ Async and sync product lists match")
+
+    def test_dashboard_queries_run_concurrently(self):
+        """Test the dashboard snapshot is computed from concurrent queries"""
+        stats, _ = async_to_sync(aget_dashboard_snapshot)()
+        self.assertEqual(stats['totalItems'], 3)
+        self.assertEqual([item['sku'] for item in stats['lowStockItems']], ['ASYNC0', 'ASYNC1'])
+        self.assertEqual(stats, compute_dashboard_stats())
+
+    def test_writes_fall_through_to_sync_view(self):
+        """Test a POST on an async-read route is handled by the APIView"""
+        view = async_views.with_async_get(CustomerListCreateView, async_views.customer_list)
+        request = self.factory.post('/api/customers/', {
+            'name': 'Async Customer', 'email': 'async@test.com', 'phone': '1', 'address': '-',
+        }, content_type='application/json')
+        response = async_to_sync(view)(request)
+        self.assertEqual(response.status_code, 201)
+
+        listing = async_to_sync(view)(self.factory.get('/api/customers/'))
+        self.assertEqual(json.loads(listing.content)[0]['name'], 'Async Customer')
+
+    def test_async_list_answers_if_none_match(self):
+        """Test the async product list shares the sync view's ETag and returns 304 on a match"""
+        etag = self.client.get('/api/products/', {'limit': 2})['ETag']
+        request = self.factory.get('/api/products/', {'limit': 2}, headers={'If-None-Match': etag})
+        response = async_to_sync(async_views.product_list)(request)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+
+class StockAlertTests(TestCase):
+    """Test the scheduled low-stock and expiry alert check"""
+
+    def setUp(self):
+        cache.clear()
+        today = timezone.localdate()
+        self.low = Product.objects.create(
+            name='Low Rice', sku='ALERT-LOW', price=Decimal('1.00'), quantity=2,
+            category='Alerts', best_before=today + timedelta(days=90), low_stock_threshold=5
+        )
+        self.expiring = Product.objects.create(
+            name='Old Milk', sku='ALERT-EXP', price=Decimal('1.00'), quantity=50,
+            category='Alerts', best_before=today + timedelta(days=3), low_stock_threshold=5
+        )
+        Product.objects.create(
+            name='Fine Oil', sku='ALERT-OK', price=Decimal('1.00'), quantity=50,
+            category='Alerts', best_before=today + timedelta(days=90), low_stock_threshold=5
+        )
+
+    def test_alerts_are_written_once(self):
+        """Test each condition notifies once and repeat runs write nothing"""
+        print("\n🔔 Testing Stock Alert Check...")
+
+        output = StringIO()
+        call_command('check_stock_alerts', '--expiry-days', '7', stdout=output)
+        messages = sorted(Notification.objects.values_list('message', flat=True))
+        print(f"✅ {output.getvalue().strip()}")
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(messages[0].startswith('Expiring soon: Old Milk'))
+        self.assertTrue(messages[1].startswith('Low stock: Low Rice'))
+
+        with self.assertNumQueries(5):
+            result = check_stock_alerts(expiry_days=7)
+        self.assertEqual(result, {'low_stock': 0, 'recovered': 0, 'expiring': 0})
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_recovery_and_new_dates_alert_again(self):
+        """Test a product that recovers and drops again, or gets a new best-before, alerts again"""
+        check_stock_alerts(expiry_days=7)
+        Product.objects.filter(pk=self.low.pk).update(quantity=20)
+        self.assertEqual(check_stock_alerts(expiry_days=7)['recovered'], 1)
+        Product.objects.filter(pk=self.low.pk).update(quantity=1)
+        Product.objects.filter(pk=self.expiring.pk).update(best_before=timezone.localdate() - timedelta(days=1))
+
+        result = check_stock_alerts(expiry_days=7)
+        self.assertEqual((result['low_stock'], result['expiring']), (1, 1))
+        self.assertTrue(Notification.objects.filter(type='error', message__startswith='Expired: Old Milk').exists())
+
+
+class ReorderForecastTests(TestCase):
+    """Test sales velocity and reorder points computed from the daily rollup"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='forecast@test.com', is_salesperson=True)
+        self.today = timezone.localdate()
+        self.steady = Product.objects.create(
+            name='Steady Beans', sku='FC-STEADY', price=Decimal('1.00'), quantity=100,
+            category='Forecast', best_before='2030-12-31', low_stock_threshold=5
+        )
+        self.idle = Product.objects.create(
+            name='Idle Salt', sku='FC-IDLE', price=Decimal('1.00'), quantity=100,
+            category='Forecast', best_before='2030-12-31', low_stock_threshold=5
+        )
+        SalesDailyRollup.objects.bulk_create(
+            SalesDailyRollup(date=self.today - timedelta(days=days_ago), product=self.steady,
+                             user=self.user, sale_count=1, units=10, amount_total=Decimal('10.00'))
+            for days_ago in range(30)
+        )
+
+    def test_forecast_and_apply(self):
+        """Test steady demand gives lead-time demand as the reorder point and reruns write nothing"""
+        print("\n📈 Testing Reorder Point Forecast...")
+
+        updated = update_reorder_points(history_days=30, half_life_days=7, lead_time_days=7,
+                                        service_z=1.65, today=self.today)
+        self.steady.refresh_from_db()
+        self.idle.refresh_from_db()
+        print(f"✅ {self.steady.name}: {self.steady.sales_velocity}/day, reorder at {self.steady.reorder_point}")
+        self.assertEqual(updated, 2)
+        self.assertEqual((self.steady.sales_velocity, self.steady.reorder_point), (10.0, 70))
+        self.assertEqual((self.idle.sales_velocity, self.idle.reorder_point), (0.0, 0))
+        self.assertEqual(self.steady.low_stock_threshold, 5)
+
+        self.assertEqual(update_reorder_points(history_days=30, half_life_days=7, lead_time_days=7,
+                                               service_z=1.65, today=self.today), 0)
+
+        call_command('forecast_reorder_points', '--history-days', '30', '--lead-time', '7', '--apply',
+                     stdout=StringIO())
+        self.steady.refresh_from_db()
+        self.assertEqual(self.steady.low_stock_threshold, 70)
+
+    def test_recent_sales_weigh_more(self):
+        """Test a recent spike raises velocity more than the same spike long ago"""
+        SalesDailyRollup.objects.create(date=self.today, product=self.idle, user=self.user,
+                                        sale_count=1, units=100, amount_total=Decimal('100.00'))
+        update_reorder_points(history_days=30, half_life_days=7, today=self.today)
+        recent = Product.objects.get(pk=self.idle.pk).sales_velocity
+
+        update_reorder_points(history_days=30, half_life_days=7, today=self.today + timedelta(days=20))
+        old = Product.objects.get(pk=self.idle.pk).sales_velocity
+        print(f"✅ Spike today: {recent}/day, 20 days on: {old}/day")
+        self.assertGreater(recent, old * 5)
+        self.assertGreater(old, 0)
+
+    def test_load_spans_chunks(self):
+        """Test rows read across several cursor chunks come back complete and in range"""
+        product_ids = np.array(sorted([self.steady.pk, self.idle.pk]), dtype=np.int64)
+        start = self.today - timedelta(days=29)
+        with mock.patch('inventory.forecasting.LOAD_CHUNK_SIZE', 7):
+            product_index, day_index, units = load_daily_units(product_ids, start, self.today)
+        self.assertEqual(len(units), 30)
+        self.assertEqual(set(product_ids[product_index].tolist()), {self.steady.pk})
+        self.assertEqual(sorted(day_index.tolist()), list(range(30)))
+        self.assertEqual(units.sum(), 300.0)
+
+
+class AbcReportTests(APITestCase):
+    """Test the ABC revenue classification report"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='abc@test.com', is_salesperson=True)
+        self.products = [
+            Product.objects.create(name=f'ABC {i}', sku=f'ABC-{i}', price=Decimal('1.00'), quantity=1000,
+                                   category='ABC', best_before='2030-12-31')
+            for i in range(4)
+        ]
+        for product, amount in zip(self.products, ['70.00', '20.00', '6.00', '4.00']):
+            self._sale(product, amount)
+
+    def _sale(self, product, amount):
+        return Sale.objects.create(user=self.user, product=product, quantity=1,
+                                   amount=Decimal(amount), status='completed')
+
+    def test_classes_from_cumulative_share(self):
+        """Test products are classed by the revenue share ranked above them"""
+        print("\n🔤 Testing ABC Report...")
+
+        response = self.client.get('/api/reports/abc/')
+        self.assertEqual(response.status_code, 200)
+        classes = [(row['sku'], row['class']) for row in response.data['results']]
+        print(f"✅ Classes: {classes}")
+        # 70% then 90% then 96% cumulative: the product crossing 80% stays in A
+        self.assertEqual(classes, [('ABC-0', 'A'), ('ABC-1', 'A'), ('ABC-2', 'B'), ('ABC-3', 'C')])
+        self.assertEqual(response.data['total_revenue'], Decimal('100.00'))
+        self.assertEqual(response.data['classes'], {'A': 2, 'B': 1, 'C': 1})
+
+        future = (timezone.localdate() + timedelta(days=1)).isoformat()
+        self.assertEqual(self.client.get('/api/reports/abc/', {'start': future}).data['results'], [])
+        self.assertEqual(self.client.get('/api/reports/abc/', {'end': 'soon'}).status_code, 400)
+
+    def test_new_sales_update_cached_report(self):
+        """Test the cached report folds in new sales and matches a full recompute"""
+        abc_report()
+        self._sale(self.products[3], '100.00')
+        with self.assertNumQueries(3):  # generation, new watermark and the per-product deltas
+            incremental = abc_report()
+        self.assertEqual(incremental['results'][0]['sku'], 'ABC-3')
+
+        cache.clear()
+        self.assertEqual(abc_report(), incremental)
+
+    def test_deleted_sale_drops_cached_report(self):
+        """Test deleting a sale forces a full recompute"""
+        abc_report()
+        with self.captureOnCommitCallbacks(execute=True):
+            Sale.objects.filter(product=self.products[0]).delete()
+        report = abc_report()
+        self.assertEqual(report['total_revenue'], Decimal('30.00'))
+        self.assertEqual(report['results'][0]['sku'], 'ABC-1')
+
+
+class SaleHistoryTests(APITestCase):
+    """Test filtering and keyset pagination of the sales history"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.alice = User.objects.create_user(email='alice@test.com', is_salesperson=True)
+        self.bob = User.objects.create_user(email='bob@test.com', is_salesperson=True)
+        self.customer = Customer.objects.create(name='History Customer', email='hist@test.com',
+                                                phone='123', address='Somewhere')
+        self.product = Product.objects.create(
+            name='History Product', sku='HIST001', price=5, quantity=100,
+            category='History', best_before='2030-12-31'
+        )
+        today = timezone.localdate()
+        for days_ago, user, sale_status in [(0, self.alice, 'completed'), (0, self.bob, 'completed'),
+                                            (1, self.alice, 'pending'), (1, self.alice, 'completed'),
+                                            (3, self.bob, 'completed'), (5, self.alice, 'completed')]:
+            sale = Sale.objects.create(user=user, product=self.product, amount=Decimal('5.00'),
+                                       status=sale_status, customer=self.customer if user == self.bob else None)
+            # date is auto_now_add; move it back afterwards
+            Sale.objects.filter(pk=sale.pk).update(date=today - timedelta(days=days_ago))
+        self.today = today
+
+    def test_pages_follow_date_then_id(self):
+        """Test following next cursors visits every sale once, newest day first"""
+        print("\n🧾 Testing Sales History Pagination...")
+
+        seen = []
+        response = self.client.get('/api/sales/', {'limit': 2})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            seen.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get('/api/sales/', {'limit': 2, 'cursor': response.data['next']})
+        print(f"✅ Pages walked: {len(seen)} sales")
+        self.assertEqual(seen, list(Sale.objects.order_by('-date', '-id').values_list('id', flat=True)))
+
+    def test_filters(self):
+        """Test salesperson, date range, customer and status filters"""
+        start = (self.today - timedelta(days=1)).isoformat()
+        response = self.client.get('/api/sales/', {'user': self.alice.id, 'start': start, 'limit': 10})
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertTrue(all(item['user'] == self.alice.id for item in response.data['results']))
+
+        response = self.client.get('/api/sales/', {'user': self.alice.id, 'status': 'pending'})
+        self.assertEqual([item['status'] for item in response.data], ['pending'])
+
+        response = self.client.get('/api/sales/', {'customer': self.customer.id})
+        self.assertEqual(len(response.data), 2)
+
+        self.assertEqual(self.client.get('/api/sales/', {'start': 'yesterday'}).status_code, 400)
+
+    def test_invalid_cursor_rejected(self):
+        """Test a product-list style cursor is not accepted for sales"""
+        product_cursor = encode_cursor([10])
+        self.assertEqual(self.client.get('/api/sales/', {'cursor': product_cursor}).status_code, 400)
+        self.assertEqual(self.client.get('/api/sales/', {'cursor': encode_cursor(['soon', 1])}).status_code, 400)
+
+
+class SaleExpandTests(APITestCase):
+    """Test expanded related rows on the sales list"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='expand@test.com', is_salesperson=True)
+        customer = Customer.objects.create(name='Expand Customer', email='exp@test.com', phone='1', address='-')
+        for i in range(5):
+            product = Product.objects.create(
+                name=f'Expand Product {i}', sku=f'EXP{i:03d}', price=3, quantity=50,
+                category='Expand', best_before='2030-12-31'
+            )
+            Sale.objects.create(user=self.user, product=product, amount=Decimal('3.00'), status='completed',
+                                customer=customer if i % 2 else None)
+
+    def test_expanded_rows_in_one_query(self):
+        """Test expand nests product, customer and user without a query per sale"""
+        print("\n🔗 Testing Sale Expansion...")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/sales/', {'expand': 'product,customer,user'})
+        self.assertEqual(response.status_code, 200)
+        print(f"✅ {len(response.data)} expanded sales from {len(queries.captured_queries)} query")
+        self.assertEqual(len(queries.captured_queries), 1)
+
+        first = response.data[0]
+        self.assertEqual(first['product']['sku'], 'EXP004')
+        self.assertEqual(first['user'], {'id': self.user.id, 'email': 'expand@test.com'})
+        self.assertIsNone(first['customer'])
+        self.assertEqual(response.data[1]['customer']['name'], 'Expand Customer')
+
+    def test_plain_ids_and_unknown_expansion(self):
+        """Test ids stay the default and unknown names are rejected"""
+        response = self.client.get('/api/sales/', {'expand': 'product', 'limit': 2})
+        self.assertIsInstance(response.data['results'][0]['product'], dict)
+        self.assertIsInstance(response.data['results'][0]['user'], int)
+        self.assertIsInstance(self.client.get('/api/sales/').data[0]['product'], int)
+        self.assertEqual(self.client.get('/api/sales/', {'expand': 'password'}).status_code, 400)
+
+
+class SparseFieldsTests(APITestCase):
+    """Test ?fields= narrowing both the payload and the SQL of list endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='sparse@test.com', is_salesperson=True)
+        self.customer = Customer.objects.create(name='Sparse Customer', email='sparse@test.com',
+                                                phone='1', address='A very long address')
+        self.product = Product.objects.create(
+            name='Sparse Product', sku='SPARSE001', price=2, quantity=40,
+            category='Sparse', best_before='2030-12-31'
+        )
+        Sale.objects.create(user=self.user, product=self.product, amount=Decimal('2.00'),
+                            status='completed', customer=self.customer)
+
+    def test_product_and_customer_fields(self):
+        """Test only the requested columns are selected and returned"""
+        print("\n🪶 Testing Sparse Fieldsets...")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/products/', {'fields': 'id,name'})
+        self.assertEqual(response.data, [{'id': self.product.id, 'name': 'Sparse Product'}])
+        product_sql = next(q['sql'] for q in queries.captured_queries if 'FROM "inventory_product"' in q['sql'])
+        print(f"✅ Product query: {product_sql}")
+        self.assertNotIn('"best_before"', product_sql)
+
+        response = self.client.get('/api/customers/', {'fields': 'name'})
+        self.assertEqual(response.data, [{'name': 'Sparse Customer'}])
+        self.assertEqual(self.client.get('/api/products/', {'fields': 'id,secret'}).status_code, 400)
+
+    def test_sales_fields_with_expand_and_pages(self):
+        """Test sale fields combine with expand and cursor pages without extra queries"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/sales/', {'fields': 'id,product', 'expand': 'product,user', 'limit': 5})
+        self.assertEqual(len(queries.captured_queries), 1)
+        row = response.data['results'][0]
+        self.assertEqual(set(row), {'id', 'product'})
+        self.assertEqual(row['product']['sku'], 'SPARSE001')
+
+    def test_audit_log_fields(self):
+        """Test the audit log returns only the requested keys"""
+        self.client.get('/api/products/')
+        response = self.client.get('/api/audit-logs/', {'fields': 'action,timestamp'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data[0]), {'action', 'timestamp'})
+        self.assertIsInstance(response.data[0]['timestamp'], str)
+
+
+class ConditionalGetTests(APITestCase):
+    """Test ETag / If-None-Match on the product, customer and settings endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.product = Product.objects.create(
+            name='Tagged Product', sku='ETAG001', price=2, quantity=40,
+            category='ETag', best_before='2030-12-31'
+        )
+
+    def test_unchanged_catalog_is_not_resent(self):
+        """Test a matching If-None-Match costs one query and a write changes the tag"""
+        print("\n🏷️ Testing Conditional GET...")
+
+        response = self.client.get('/api/products/')
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+        print(f"✅ {etag} -> {response.status_code}")
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+        self.assertNotEqual(self.client.get('/api/products/', {'fields': 'id'})['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f'/api/products/{self.product.pk}/', {
+                'name': 'Renamed Product', 'sku': 'ETAG001', 'price': 2, 'quantity': 40,
+                'category': 'ETag', 'best_before': '2030-12-31',
+            }, format='json')
+        response = self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data[0]['name'], 'Renamed Product')
+
+    def test_bulk_stock_changes_bump_the_catalog(self):
+        """Test writes that bypass model signals still change the product ETag"""
+        etag = self.client.get('/api/products/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            adjust_stock([{'product': self.product.pk, 'quantity': 5}])
+        self.assertEqual(self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_customers_and_settings(self):
+        """Test customers and system settings are tagged per collection"""
+        customers_etag = self.client.get('/api/customers/')['ETag']
+        settings_etag = self.client.get('/api/system-settings/')['ETag']
+        self.assertEqual(self.client.get('/api/customers/', HTTP_IF_NONE_MATCH=customers_etag).status_code, 304)
+        self.assertEqual(self.client.get('/api/system-settings/', HTTP_IF_NONE_MATCH=settings_etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Customer.objects.create(name='New Customer', email='new@test.com', phone='1', address='-')
+        self.assertEqual(self.client.get('/api/customers/', HTTP_IF_NONE_MATCH=customers_etag).status_code, 200)
+        self.assertEqual(self.client.get('/api/system-settings/', HTTP_IF_NONE_MATCH=settings_etag).status_code, 304)
+
+
 if __name__ == '__main__':
     print("🚀 Running Comprehensive Inventory Management System Tests...")
     print("=" * 70)
\ No newline at end of file
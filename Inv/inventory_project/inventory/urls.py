@@ -1,26 +1,57 @@
 from django.urls import path
-from .views import AdminRegisterView, AdminLoginView, SalespersonLoginOrRegisterView
+from .views import AdminRegisterView, AdminLoginView, SalespersonLoginOrRegisterView, LogoutView
 # inventory/urls.py
+from django.conf import settings
 from django.urls import path
 from .views import GenerateTokenView, ProductListCreateView, ProductDetailView, CustomerDetailView, CustomerListCreateView
 from .views import DashboardStatsView, AuditLogView, SystemSettingsView, SaleListCreateView, NotificationListCreateView
-from .views import UserListCreateView, UserDetailView, GenerateUserTokenView
+from .views import SaleCheckoutView, SaleExportView, SalesReportView, PricingQuoteView, ProductImportView, ProductStockView
+from .views import AbcReportView
+from .views import UserListCreateView, UserDetailView, GenerateUserTokenView, notification_stream
 
 urlpatterns = [
     path('admin/register/', AdminRegisterView.as_view()),
     path('admin/login/', AdminLoginView.as_view()),
     path('salesperson/auth/', SalespersonLoginOrRegisterView.as_view()),
+    path('logout/', LogoutView.as_view(), name='logout'),
     path('generate-token/', GenerateTokenView.as_view(), name='generate_token'),
     path('products/', ProductListCreateView.as_view(), name='product_list_create'),
+    path('products/import/', ProductImportView.as_view(), name='product_import'),
+    path('products/stock/', ProductStockView.as_view(), name='product_stock'),
     path('products/<int:pk>/', ProductDetailView.as_view(), name='product_detail'),
     path('customers/', CustomerListCreateView.as_view(), name='customer_list_create'),
     path('customers/<int:pk>/', CustomerDetailView.as_view(), name='customer_detail'),
     path('sales/', SaleListCreateView.as_view(), name='sale_list_create'),
+    path('sales/checkout/', SaleCheckoutView.as_view(), name='sale_checkout'),
+    path('sales/export/', SaleExportView.as_view(), name='sale_export'),
+    path('pricing/quote/', PricingQuoteView.as_view(), name='pricing_quote'),
     path('users/', UserListCreateView.as_view(), name='user_list_create'),
     path('users/<int:pk>/', UserDetailView.as_view(), name='user_detail'),
     path('users/generate-token/', GenerateUserTokenView.as_view(), name='generate_user_token'),
+    path('reports/sales/', SalesReportView.as_view(), name='sales_report'),
+    path('reports/abc/', AbcReportView.as_view(), name='abc_report'),
     path('dashboard-stats/', DashboardStatsView.as_view(), name='dashboard_stats'),
     path('audit-logs/', AuditLogView.as_view(), name='audit_log_list'),
     path('notifications/', NotificationListCreateView.as_view(), name='notification_list_create'),
     path('system-settings/', SystemSettingsView.as_view(), name='system_settings'),
 ]
+
+# Under ASGI the read-heavy GETs are served by async views (writes still go
+# through the APIViews above); see inventory/async_views.py. The event stream
+# is only routed there: under WSGI its endless generator would be consumed
+# into a list and the worker held forever.
+if getattr(settings, 'ASYNC_READ_VIEWS', False):
+    from . import async_views
+
+    ASYNC_GETS = {
+        'product_list_create': (ProductListCreateView, async_views.product_list),
+        'customer_list_create': (CustomerListCreateView, async_views.customer_list),
+        'sale_list_create': (SaleListCreateView, async_views.sale_list),
+        'dashboard_stats': (DashboardStatsView, async_views.dashboard_stats),
+    }
+    urlpatterns = [
+        path(str(pattern.pattern), async_views.with_async_get(*ASYNC_GETS[pattern.name]), name=pattern.name)
+        if pattern.name in ASYNC_GETS else pattern
+        for pattern in urlpatterns
+    ]
+    urlpatterns.append(path('notifications/stream/', notification_stream, name='notification_stream'))
@@ -13,6 +13,9 @@ from django.db.models import F
 from django.db import transaction
 from django.utils import timezone
 import json
+from .audit import audit_sink, record_audit
+from .idempotency import idempotent
+from .system_settings import get_system_settings
 # inventory/views.py
 # inventory/views.py
 
@@ -21,26 +24,105 @@ from rest_framework.response import Response
 from rest_framework import status
 from .models import Product
 from .serializers import ProductSerializer
+from .pagination import IdCursorPagination, InvalidCursor, wants_cursor_page
+from .filters import InvalidFilter, fields_param, filter_products
+from .versions import CUSTOMERS, PRODUCTS, SYSTEM_SETTINGS, versioned
+from .imports import InvalidImport, detect_format, import_products, read_rows
+from rest_framework.parsers import MultiPartParser
+from .serializers import StockAdjustmentSerializer
+from .stock import InsufficientStock, UnknownProducts, adjust_stock
+from .stock import announce_crossings, is_low_stock, low_stock_crossing
+from .ledger import record_movements, with_ledger_stock
+from .filters import as_of_param
 
 class ProductListCreateView(APIView):
     authentication_classes = []  # No authentication required for now
     permission_classes = []      # No permissions required for now
     
+    @versioned(PRODUCTS)
     def get(self, request):
-        products = Product.objects.all().order_by('-id')
-        serializer = ProductSerializer(products, many=True)
+        try:
+            products = filter_products(Product.objects.all(), request.query_params)
+            fields = fields_param(request.query_params, ProductSerializer.field_names())
+        except InvalidFilter as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if fields:
+            products = products.only(*ProductSerializer.columns(fields))
         log_audit("VIEW", "User", "Viewed product list", request)
+        if wants_cursor_page(request):
+            try:
+                page, next_cursor = IdCursorPagination().paginate(products, request)
+            except InvalidCursor:
+                return Response({'error': 'Invalid cursor or limit'}, status=status.HTTP_400_BAD_REQUEST)
+            serializer = ProductSerializer(page, many=True, fields=fields)
+            return Response({'results': serializer.data, 'next': next_cursor})
+        serializer = ProductSerializer(products.order_by('-id'), many=True, fields=fields)
         return Response(serializer.data)
 
+    @idempotent('products')
     def post(self, request):
         serializer = ProductSerializer(data=request.data)
         if serializer.is_valid():
-            product = serializer.save()
+            with transaction.atomic():
+                product = serializer.save()
+                record_movements('initial', [(product.pk, product.quantity, 'created')])
             log_audit("CREATE", "Admin", f"Created product: {product.name}", request, 
                      f"SKU: {product.sku}, Price: {product.price}")
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class ProductImportView(APIView):
+    authentication_classes = []  # No authentication required for now
+    permission_classes = []      # No permissions required for now
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Upload a CSV or NDJSON file as "file"'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            file_format = detect_format(upload, request.query_params.get('type'))
+            report = import_products(read_rows(upload, file_format))
+        except InvalidImport as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        log_audit("IMPORT", "Admin", f"Imported products from {upload.name}", request,
+                  f"Created: {report['created']}, Updated: {report['updated']}, Rejected: {report['rejected']}")
+        return Response(report)
+
+class ProductStockView(APIView):
+    authentication_classes = []  # No authentication required for now
+    permission_classes = []      # No permissions required for now
+
+    def get(self, request):
+        """Stock levels from the ledger, optionally as of ?as_of=<date or datetime>"""
+        try:
+            at = as_of_param(request.query_params, 'as_of')
+            products = filter_products(Product.objects.all(), request.query_params)
+        except InvalidFilter as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        rows = with_ledger_stock(products, at).order_by('id').values('id', 'sku', 'stock')
+        return Response([{'id': row['id'], 'sku': row['sku'], 'quantity': row['stock']} for row in rows])
+
+    def patch(self, request):
+        data = {'items': request.data} if isinstance(request.data, list) else request.data
+        serializer = StockAdjustmentSerializer(data=data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            result = adjust_stock(serializer.validated_data['items'])
+        except UnknownProducts as e:
+            return Response({'error': 'Unknown products', 'products': e.product_ids},
+                            status=status.HTTP_400_BAD_REQUEST)
+        except InsufficientStock as e:
+            return Response({'error': 'Stock cannot go below zero', 'shortages': e.shortages},
+                            status=status.HTTP_409_CONFLICT)
+
+        log_audit("UPDATE", "Admin", f"Adjusted stock for {len(result['products'])} products", request,
+                  f"Crossed low-stock threshold: {len(result['crossed'])}")
+        return Response(result)
+
 class ProductDetailView(APIView):
     authentication_classes = []  # No authentication required for now
     permission_classes = []      # No permissions required for now
@@ -59,13 +141,17 @@ class ProductDetailView(APIView):
         return Response(serializer.data)
 
     def put(self, request, pk):
-        product = self.get_object(pk)
-        if not product:
-            return Response({'detail': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
-        serializer = ProductSerializer(product, data=request.data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
+        with transaction.atomic():
+            product = Product.objects.select_for_update().filter(pk=pk).first()
+            if not product:
+                return Response({'detail': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
+            previous_quantity, was_low = product.quantity, is_low_stock(product)
+            serializer = ProductSerializer(product, data=request.data)
+            if serializer.is_valid():
+                serializer.save()
+                record_movements('adjustment', [(product.pk, product.quantity - previous_quantity, 'product-edit')])
+                announce_crossings(filter(None, [low_stock_crossing(product, product.quantity, was_low)]))
+                return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, pk):
@@ -104,6 +190,14 @@ class AdminLoginView(APIView):
 
 
 
+class LogoutView(APIView):
+    def post(self, request):
+        if isinstance(request.auth, Token):
+            request.auth.delete()  # also evicts it from the auth cache
+        log_audit("LOGOUT", request.user.email, "Logged out", request)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 from django.contrib.auth import get_user_model
 from .serializers import SalespersonAuthSerializer
 
@@ -179,9 +273,16 @@ class CustomerListCreateView(APIView):
     authentication_classes = []  # No authentication required for now
     permission_classes = []      # No permissions required for now
     
+    @versioned(CUSTOMERS)
     def get(self, request):
+        try:
+            fields = fields_param(request.query_params, CustomerSerializer.field_names())
+        except InvalidFilter as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         customers = Customer.objects.all().order_by('-join_date')
-        serializer = CustomerSerializer(customers, many=True)
+        if fields:
+            customers = customers.only(*CustomerSerializer.columns(fields))
+        serializer = CustomerSerializer(customers, many=True, fields=fields)
         return Response(serializer.data)
 
     def post(self, request):
@@ -229,17 +330,43 @@ class CustomerDetailView(APIView):
 # inventory/views.py
 
 from .models import Sale
-from .serializers import SaleSerializer
+from .serializers import SALE_EXPANSIONS, CheckoutSerializer, PricingQuoteSerializer, SaleSerializer, project_sales
+from .pricing import get_pricing_engine
+from django.db.models import Q
+from .stock import InsufficientStock, UnknownProducts, checkout
+from .exports import EXPORT_FORMATS, aiter_chunks, sale_export_rows
+from .abc_analysis import abc_report
+from .filters import InvalidFilter, date_range, expand_param, filter_sale_history, filter_sales
+from .pagination import DateIdCursorPagination
+from .models import SalesDailyRollup
+from .rollups import REPORT_PERIODS, sales_report
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.negotiation import BaseContentNegotiation
 
 class SaleListCreateView(APIView):
     authentication_classes = []  # No authentication required for now
     permission_classes = []      # No permissions required for now
     
     def get(self, request):
-        sales = Sale.objects.all().order_by('-date')
-        serializer = SaleSerializer(sales, many=True)
+        try:
+            sales = filter_sale_history(Sale.objects.all(), request.query_params)
+            fields = fields_param(request.query_params, SaleSerializer.field_names())
+            expand = expand_param(request.query_params, SALE_EXPANSIONS)
+        except InvalidFilter as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        sales, expand = project_sales(sales, fields, expand)
+        if wants_cursor_page(request):
+            try:
+                page, next_cursor = DateIdCursorPagination().paginate(sales, request)
+            except InvalidCursor:
+                return Response({'error': 'Invalid cursor or limit'}, status=status.HTTP_400_BAD_REQUEST)
+            serializer = SaleSerializer(page, many=True, fields=fields, expand=expand)
+            return Response({'results': serializer.data, 'next': next_cursor})
+        serializer = SaleSerializer(sales.order_by('-date', '-id'), many=True, fields=fields, expand=expand)
         return Response(serializer.data)
 
+    @idempotent('sales')
     def post(self, request):
         serializer = SaleSerializer(data=request.data)
         if serializer.is_valid():
@@ -247,32 +374,145 @@ class SaleListCreateView(APIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class SaleCheckoutView(APIView):
+    authentication_classes = []  # No authentication required for now
+    permission_classes = []      # No permissions required for now
+
+    @idempotent('checkout')
+    def post(self, request):
+        serializer = CheckoutSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        user = data.get('user') or (request.user if request.user.is_authenticated else None)
+        if user is None:
+            return Response({'user': ['This field is required.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            sales, totals = checkout(user, data.get('customer'), data['items'], data['status'], data['rules'])
+        except UnknownProducts as e:
+            return Response({'error': 'Unknown products', 'products': e.product_ids},
+                            status=status.HTTP_400_BAD_REQUEST)
+        except InsufficientStock as e:
+            return Response({'error': 'Insufficient stock', 'shortages': e.shortages},
+                            status=status.HTTP_409_CONFLICT)
+
+        log_audit("SALE", user.email, f"Checked out {len(sales)} line items", request, f"Total: {totals['total']}")
+        return Response({
+            'sales': SaleSerializer(sales, many=True).data,
+            **totals,
+        }, status=status.HTTP_201_CREATED)
+
+
+class PricingQuoteView(APIView):
+    authentication_classes = []  # No authentication required for now
+    permission_classes = []      # No permissions required for now
+
+    def post(self, request):
+        serializer = PricingQuoteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        items = serializer.validated_data['items']
+        ids = {item['product'] for item in items if item.get('product') is not None}
+        skus = {item['sku'] for item in items if item.get('product') is None}
+        by_id, by_sku = {}, {}
+        for product in Product.objects.filter(Q(pk__in=ids) | Q(sku__in=skus)).only('id', 'sku', 'price', 'category'):
+            by_id[product.pk] = by_sku[product.sku] = product
+
+        lines, missing = [], []
+        for item in items:
+            product = by_id.get(item['product']) if item.get('product') is not None else by_sku.get(item['sku'])
+            if product is None:
+                missing.append(item.get('product', item.get('sku')))
+            else:
+                lines.append((product, item['quantity']))
+        if missing:
+            return Response({'error': 'Unknown products', 'products': missing}, status=status.HTTP_400_BAD_REQUEST)
+
+        quote = get_pricing_engine().quote(lines, serializer.validated_data['rules'])
+        quote['currency'] = get_system_settings().currency
+        return Response(quote)
+
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """Streamed downloads choose their own content type regardless of Accept"""
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return (renderers[0], renderers[0].media_type)
+
+
+class SaleExportView(APIView):
+    authentication_classes = []  # No authentication required for now
+    permission_classes = []      # No permissions required for now
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    def get(self, request):
+        export_type = request.query_params.get('type', 'csv')
+        if export_type not in EXPORT_FORMATS:
+            return Response({'error': f"type must be one of: {', '.join(EXPORT_FORMATS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            sales = filter_sale_history(Sale.objects.all(), request.query_params)
+        except InvalidFilter as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        stream, content_type, extension = EXPORT_FORMATS[export_type]
+        content = stream(sale_export_rows(sales))
+        if isinstance(request._request, ASGIRequest):
+            # A sync iterator would be buffered whole under ASGI
+            content = aiter_chunks(content)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        filename = f"sales-{timezone.localdate().isoformat()}.{extension}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        log_audit("EXPORT", "User", f"Exported sales ({export_type})", request,
+                  json.dumps(dict(request.query_params.items())))
+        return response
+
+class SalesReportView(APIView):
+    authentication_classes = []  # No authentication required for now
+    permission_classes = []      # No permissions required for now
+
+    def get(self, request):
+        period = request.query_params.get('period', 'day')
+        if period not in REPORT_PERIODS:
+            return Response({'error': f"period must be one of: {', '.join(REPORT_PERIODS)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            rollup_rows = filter_sales(SalesDailyRollup.objects.all(), request.query_params)
+        except InvalidFilter as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(list(sales_report(rollup_rows, period)))
+
+
+class AbcReportView(APIView):
+    authentication_classes = []  # No authentication required for now
+    permission_classes = []      # No permissions required for now
+
+    def get(self, request):
+        try:
+            start, end = date_range(request.query_params)
+        except InvalidFilter as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(abc_report(start, end))
+
 # inventory/views.py
 
 from django.db.models import Sum, Count, Q
 from .models import Product, Sale, Customer, User
+from .dashboard import get_dashboard_snapshot
 
 class DashboardStatsView(APIView):
     authentication_classes = []  # No authentication required for now
     permission_classes = []      # No permissions required for now
     
     def get(self, request):
-        total_items = Product.objects.aggregate(total=Count('id'))['total']
-        total_sales = Sale.objects.aggregate(total=Count('id'))['total']
-        total_revenue = Sale.objects.aggregate(total=Sum('amount'))['total'] or 0
-        active_sales_personnel = User.objects.filter(is_salesperson=True, is_active=True).count()
-
-        low_stock_items = Product.objects.filter(quantity__lte=F('low_stock_threshold')).values(
-            'id', 'name', 'quantity', 'sku'
-        )
-
-        return Response({
-            "totalItems": total_items,
-            "totalSales": total_sales,
-            "totalRevenue": total_revenue,
-            "activeSalesPersonnel": active_sales_personnel,
-            "lowStockItems": list(low_stock_items)
-        })
+        stats, age = get_dashboard_snapshot()
+        return Response({**stats, "snapshotAge": round(age, 3)})
 
 
 # inventory/views.py
@@ -303,6 +543,55 @@ class NotificationListCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+# inventory/views.py
+
+import asyncio
+from django.conf import settings
+from .events import broker, event_poller, format_event
+
+RECONNECT_DELAY_MS = 3000
+
+
+async def _event_stream(last_event_id):
+    subscriber, backlog = broker.subscribe(last_event_id)
+    try:
+        await event_poller.start()
+        yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+        if backlog is None:
+            # Missed events are gone; the client should reload its lists
+            yield format_event(broker.latest_event_id(), 'reset', {})
+        else:
+            for sequence, event, data in backlog:
+                yield format_event(broker.event_id(sequence), event, data)
+
+        heartbeat = getattr(settings, 'EVENT_STREAM_HEARTBEAT', 15)
+        while True:
+            try:
+                sequence, event, data = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(broker.event_id(sequence), event, data)
+            if subscriber.overflowed and subscriber.queue.empty():
+                break  # the client reconnects and resumes from the buffer
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+async def notification_stream(request):
+    """
+    Server-sent events for new notifications and low-stock transitions.
+
+    Served by the ASGI application (inventory_project/asgi.py), where each
+    open stream is a coroutine rather than a worker thread.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('lastEventId')
+    response = StreamingHttpResponse(_event_stream(last_event_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
+
+
 # inventory/views.py
 
 from .models import SystemSettings
@@ -409,48 +698,47 @@ def log_audit(action_type, user_email, action, request, details=""):
     """Helper function to log audit events"""
     try:
         ip_address = request.META.get('REMOTE_ADDR', '127.0.0.1')
-        AuditLog.objects.create(
+        record_audit(AuditLog(
             type=action_type,
             user=user_email or "System",
             action=action,
             ip_address=ip_address,
             details=details,
             timestamp=timezone.now()
-        )
+        ))
     except Exception as e:
         print(f"Audit logging failed: {e}")
 
+AUDIT_LOG_FIELDS = ['id', 'type', 'user', 'action', 'timestamp', 'ip_address', 'details']
+
 class AuditLogView(APIView):
     authentication_classes = []  # No authentication required for now
     permission_classes = []      # No permissions required for now
     
     def get(self, request):
         """Get all audit logs"""
-        logs = AuditLog.objects.all().order_by('-timestamp')[:100]  # Latest 100
-        audit_data = []
-        for log in logs:
-            audit_data.append({
-                'id': log.id,
-                'type': log.type,
-                'user': log.user,
-                'action': log.action,
-                'timestamp': log.timestamp.isoformat(),
-                'ip_address': log.ip_address,
-                'details': log.details
-            })
-        return Response(audit_data, status=status.HTTP_200_OK)
+        try:
+            fields = fields_param(request.query_params, AUDIT_LOG_FIELDS) or AUDIT_LOG_FIELDS
+        except InvalidFilter as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        audit_sink.flush()  # Show events still waiting in the queue
+        audit_data = list(AuditLog.objects.order_by('-timestamp').values(*fields)[:100])  # Latest 100
+        if 'timestamp' in fields:
+            for entry in audit_data:
+                entry['timestamp'] = entry['timestamp'].isoformat()
+        return Response(audit_data, status=status.HTTP_200_OK, headers={
+            'X-Audit-Dropped': str(audit_sink.dropped),
+        })
 
 class SystemSettingsView(APIView):
     authentication_classes = []  # No authentication required for now
     permission_classes = []      # No permissions required for now
     
+    @versioned(SYSTEM_SETTINGS)
     def get(self, request):
         """Get system settings"""
         try:
-            settings = SystemSettings.objects.first()
-            if not settings:
-                # Create default settings
-                settings = SystemSettings.objects.create()
+            settings = get_system_settings()
             
             return Response({
                 'currency': settings.currency,
@@ -487,7 +775,7 @@ class SystemSettingsView(APIView):
             if 'notifications' in request.data:
                 settings.notifications = request.data['notifications']
             
-            settings.save()
+            settings.save()  # post_save bumps the system-settings collection version
             
             # Log the change
             log_audit("SETTINGS", "Admin", f"Updated system settings", request, 
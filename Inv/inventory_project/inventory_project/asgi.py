@@ -0,0 +1,21 @@
+"""
+ASGI config for inventory_project project.
+
+Serves the whole API with the async read views (``ASYNC_READ_VIEWS``), and
+is required for the long-lived /api/notifications/stream/ connections, which
+are only routed under ASGI, e.g.:
+
+    uvicorn inventory_project.asgi:application
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_project.settings')
+os.environ.setdefault('ASYNC_READ_VIEWS', 'True')
+
+application = get_asgi_application()
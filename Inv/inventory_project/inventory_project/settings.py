@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,7 +44,7 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'inventory.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -97,8 +98,14 @@ CORS_ALLOWED_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'idempotency-key',
+    'last-event-id',
+    'if-none-match',
 ]
 
+# Let browser code read the list ETags to send back in If-None-Match
+CORS_EXPOSE_HEADERS = ['etag']
+
 CORS_ALLOW_METHODS = [
     'DELETE',
     'GET',
@@ -125,6 +132,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'inventory_project.wsgi.application'
+ASGI_APPLICATION = 'inventory_project.asgi.application'
 
 
 # Database
@@ -267,6 +275,70 @@ CACHES = {
     }
 }
 
+# Dashboard stats are served from a cached snapshot for this many seconds
+# unless a Product or Sale write invalidates it sooner.
+DASHBOARD_STATS_TTL = 30
+
+# Token authentication results are cached: AUTH_TOKEN_LRU_SIZE entries per
+# process for AUTH_TOKEN_LOCAL_TTL seconds, backed by the shared cache for
+# AUTH_TOKEN_CACHE_TTL seconds. Logout, token changes and user updates evict.
+# The shared tier is skipped while CACHES is a per-process backend (LocMemCache),
+# so other workers notice a revoked token within AUTH_TOKEN_LOCAL_TTL seconds.
+AUTH_TOKEN_LRU_SIZE = 1024
+AUTH_TOKEN_LOCAL_TTL = 10
+AUTH_TOKEN_CACHE_TTL = 300
+
+# Responses to create requests sent with an Idempotency-Key header are kept
+# this long (seconds) in the IdempotencyKey table and replayed for retries
+# carrying the same key; purge_idempotency_keys deletes expired rows.
+IDEMPOTENCY_KEY_TTL = 86400
+# A request still running holds its key for at most this long (seconds); keep
+# it near the worker timeout so a crashed request doesn't block retries.
+IDEMPOTENCY_CLAIM_TTL = 60
+
+# Audit logging: events are queued in-process and written in batches by a
+# background thread. Tests write synchronously so assertions see the rows.
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+AUDIT_LOG_ASYNC = os.environ.get('AUDIT_LOG_ASYNC', str(not TESTING)).lower() == 'true'
+AUDIT_LOG_BATCH_SIZE = 100
+AUDIT_LOG_FLUSH_INTERVAL = 2.0  # seconds
+AUDIT_LOG_QUEUE_SIZE = 10000
+
+# Each worker checks the system-settings version (and reloads the row if it
+# moved) at most this often, in seconds; its own writes apply immediately.
+SYSTEM_SETTINGS_CHECK_INTERVAL = 5
+
+# Notification stream (/api/notifications/stream/): events kept for
+# Last-Event-ID resume, per-client backlog before a slow client is dropped,
+# seconds between keepalive comments, and seconds between polls for new
+# Notification and StreamEvent rows (written by any worker or the
+# check_stock_alerts job; purge_stream_events deletes old StreamEvent rows)
+EVENT_STREAM_BUFFER_SIZE = 1000
+EVENT_STREAM_MAX_PENDING = 100
+EVENT_STREAM_HEARTBEAT = 15
+EVENT_STREAM_POLL_INTERVAL = 2
+
+# check_stock_alerts warns about products whose best_before is this close
+EXPIRY_ALERT_DAYS = 14
+
+# forecast_reorder_points: days of sales history used, half-life of the
+# exponential weighting, supplier lead time and safety-stock z-score
+FORECAST_HISTORY_DAYS = 90
+FORECAST_HALF_LIFE_DAYS = 14
+FORECAST_LEAD_TIME_DAYS = 7
+FORECAST_SERVICE_Z = 1.65  # ~95% of lead-time demand covered
+
+# /api/reports/abc/: cumulative revenue share closing classes A and B, and
+# seconds a cached report is updated incrementally before a full recompute
+ABC_CLASS_A_SHARE = 0.8
+ABC_CLASS_B_SHARE = 0.95
+ABC_REPORT_TTL = 3600
+
+# Serve the product/customer/sale lists and dashboard stats GETs from async
+# views (inventory/async_views.py) and route /api/notifications/stream/. Only
+# for ASGI; asgi.py and asgi_production.py turn it on.
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', 'False').lower() == 'true'
+
 # Session Configuration
 SESSION_COOKIE_AGE = 86400  # 24 hours
 SESSION_COOKIE_HTTPONLY = True
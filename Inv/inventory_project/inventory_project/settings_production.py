@@ -33,6 +33,11 @@ DATABASES = {
     }
 }
 
+# Under ASGI (asgi_production.py) requests are not tied to one thread, so
+# persistent connections are not reused safely; open one per request instead.
+if ASYNC_READ_VIEWS:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+
 # CORS settings for production
 CORS_ALLOWED_ORIGINS = [
     "https://your-app-name.vercel.app",  # Replace with your actual Vercel URL